@@ -4,54 +4,128 @@ Simplified version for zero-cost deployment and market validation
 """
 
 import os
+import sys
+import gzip
 import json
 import sqlite3
 import asyncio
+import hmac
 import hashlib
-import tempfile
+import secrets
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
+def _available_cpus():
+    """CPUs this process may actually use (affinity mask and cgroup quota)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on Windows/macOS
+        cpus = os.cpu_count() or 1
+    # Containers limited with --cpus expose the quota here, not in the mask
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+CPU_COUNT = _available_cpus()
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", str(min(2, CPU_COUNT))))  # Per transcription job
+# Must be set before CTranslate2/onnxruntime load, or they size their
+# OpenMP pools from the host's core count
+os.environ.setdefault("OMP_NUM_THREADS", str(WHISPER_CPU_THREADS))
+
+import av
+import numpy as np
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Depends
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from sse_starlette.sse import EventSourceResponse
 import uvicorn
 
-# Try to import faster-whisper, fall back to openai-whisper
-try:
-    from faster_whisper import WhisperModel
-    USING_FASTER_WHISPER = True
-except ImportError:
-    import whisper
-    USING_FASTER_WHISPER = False
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 
 # Configuration
 UPLOAD_DIR = Path("uploads")
+# Uploads wait for transcription on tmpfs where available, so decoding reads from RAM
+HOT_DIR = Path(os.getenv("HOT_DIR", "/dev/shm/whisper" if Path("/dev/shm").is_dir() else UPLOAD_DIR))
+KEEP_UPLOADS = os.getenv("KEEP_UPLOADS", "true").lower() == "true"  # Retain until cleanup
 DB_PATH = Path("demo.db")
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1MiB
 MAX_DURATION_SECONDS = 300  # 5 minutes
 MAX_UPLOADS_PER_IP = 10
 CLEANUP_AFTER_HOURS = 24
 WHISPER_MODEL = "tiny"  # Use tiny for demo (39MB)
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "auto")  # auto, cpu or cuda
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "auto")
+WORKERS = int(os.getenv("WORKERS", str(max(1, CPU_COUNT // 2))))  # Uvicorn processes
+# Transcription jobs run concurrently in each process
+TRANSCRIBE_WORKERS = max(1, CPU_COUNT // (WHISPER_CPU_THREADS * WORKERS))
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "100"))  # Per process
+STREAM_RECHECK_SECONDS = 5  # Jobs may finish in another worker process
+BEAM_SIZE = int(os.getenv("BEAM_SIZE", "1"))  # Greedy decoding by default
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "8"))  # VAD chunks per forward pass; 1 disables batching
 DEMO_PASSWORD = os.getenv("DEMO_PASSWORD", "whisper2025")
+DEMO_AUTH_HASH = hashlib.sha256(DEMO_PASSWORD.encode()).hexdigest()
 
 # Create directories
 UPLOAD_DIR.mkdir(exist_ok=True)
+HOT_DIR.mkdir(parents=True, exist_ok=True)
 Path("static").mkdir(exist_ok=True)
 Path("templates").mkdir(exist_ok=True)
 
+# SQLite tuning for the shared connection
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Serializes access to the shared connection across threads
+db_lock = threading.Lock()
+
+def open_db():
+    """Open the process-wide SQLite connection"""
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def db_fetchone(query, params=()):
+    """Run a read query on the shared connection and return the first row"""
+    with db_lock:
+        return app.state.db.execute(query, params).fetchone()
+
+@contextmanager
+def db_transaction():
+    """Run a group of writes as a single transaction on the shared connection"""
+    conn = app.state.db
+    with db_lock:
+        # Take the write lock up front so the statements commit together
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
 # Initialize database
-def init_db():
+def init_db(conn):
     """Initialize SQLite database"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
     # Create tables
-    c.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS jobs (
             id TEXT PRIMARY KEY,
             ip_address TEXT,
@@ -66,7 +140,7 @@ def init_db():
         )
     ''')
     
-    c.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS usage_stats (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             ip_address TEXT,
@@ -75,21 +149,76 @@ def init_db():
         )
     ''')
     
-    conn.commit()
-    conn.close()
+    # Required by the ON CONFLICT upsert on upload
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_usage_ip_date
+        ON usage_stats(ip_address, date)
+    ''')
+    
+    # Indexes for the cleanup scan and status lookups
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs(created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs(status)")
 
 # Whisper model (global to avoid reloading)
 whisper_model = None
 
+# Decoding options shared by every job
+TRANSCRIBE_OPTIONS = {
+    "beam_size": BEAM_SIZE,
+    "best_of": 1,
+    "temperature": 0.0,
+    "language": "en",
+    "condition_on_previous_text": False,
+    "vad_filter": True,
+    "vad_parameters": {"min_silence_duration_ms": 500},
+}
+if BATCH_SIZE > 1:
+    TRANSCRIBE_OPTIONS["batch_size"] = BATCH_SIZE
+
+def select_device():
+    """Use the GPU when CTranslate2 can see one, unless overridden"""
+    if WHISPER_DEVICE != "auto":
+        return WHISPER_DEVICE
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
+def select_compute_type(device="cpu"):
+    """Pick the fastest CTranslate2 compute type supported on this device"""
+    if WHISPER_COMPUTE_TYPE != "auto":
+        return WHISPER_COMPUTE_TYPE
+    if device == "cuda":
+        return "float16"
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types("cpu")
+    except Exception:
+        return "int8"
+    # int8_float32 uses the VNNI int8 GEMM kernels where the CPU has them
+    if "int8_float32" in supported:
+        return "int8_float32"
+    return "int8" if "int8" in supported else "auto"
+
 def load_whisper_model():
     """Load Whisper model once"""
     global whisper_model
     if whisper_model is None:
         print(f"Loading Whisper model: {WHISPER_MODEL}")
-        if USING_FASTER_WHISPER:
-            whisper_model = WhisperModel(WHISPER_MODEL, device="cpu", compute_type="int8")
-        else:
-            whisper_model = whisper.load_model(WHISPER_MODEL)
+        device = select_device()
+        compute_type = select_compute_type(device)
+        print(f"Using device: {device}, compute type: {compute_type}")
+        whisper_model = WhisperModel(
+            WHISPER_MODEL,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=WHISPER_CPU_THREADS,
+            num_workers=TRANSCRIBE_WORKERS
+        )
+        if BATCH_SIZE > 1:
+            # Transcribe a file's VAD-split chunks in batches instead of one by one
+            whisper_model = BatchedInferencePipeline(model=whisper_model)
         print("Model loaded successfully")
     return whisper_model
 
@@ -97,13 +226,38 @@ def load_whisper_model():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    init_db()
+    # Transcriptions and SQLite calls run on this pool; CTranslate2 releases
+    # the GIL inside its kernels so jobs can use separate cores. Size it for
+    # the transcription workers plus the usual headroom for short DB calls,
+    # so busy workers never hold up request handlers.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=TRANSCRIBE_WORKERS + min(32, CPU_COUNT + 4))
+    )
+    app.state.db = open_db()
+    init_db(app.state.db)
     load_whisper_model()
+    # The landing page has no per-request content, so render it once
+    app.state.index_html = templates.get_template("index.html").render().encode()
+    app.state.index_html_gz = gzip.compress(app.state.index_html)
+    # Status subscribers per job, fed by the transcription workers
+    app.state.subscribers = {}
+    # Progress of jobs running in this process; SQLite only gets their
+    # start and terminal state
+    app.state.progress = {}
+    app.state.loop = asyncio.get_running_loop()
+    # Start transcription workers
+    app.state.jobs = asyncio.Queue()
+    workers = [
+        asyncio.create_task(transcription_worker(app.state.jobs))
+        for _ in range(TRANSCRIBE_WORKERS)
+    ]
     # Start cleanup task
     asyncio.create_task(cleanup_old_files())
     yield
     # Shutdown
-    pass
+    for worker in workers:
+        worker.cancel()
+    app.state.db.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -129,7 +283,7 @@ templates = Jinja2Templates(directory="templates")
 async def check_demo_auth(request: Request):
     """Check if user has demo password in cookie"""
     demo_auth = request.cookies.get("demo_auth")
-    if demo_auth != hashlib.sha256(DEMO_PASSWORD.encode()).hexdigest():
+    if not hmac.compare_digest(demo_auth or "", DEMO_AUTH_HASH):
         raise HTTPException(status_code=401, detail="Demo authentication required")
     return True
 
@@ -139,53 +293,45 @@ async def check_rate_limit(request: Request):
     client_ip = request.client.host
     today = datetime.now().strftime("%Y-%m-%d")
     
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Get or create usage record
-    c.execute("""
+    # Get usage record
+    result = await asyncio.to_thread(db_fetchone, """
         SELECT upload_count FROM usage_stats 
         WHERE ip_address = ? AND date = ?
     """, (client_ip, today))
     
-    result = c.fetchone()
     if result and result[0] >= MAX_UPLOADS_PER_IP:
-        conn.close()
         raise HTTPException(
             status_code=429, 
             detail=f"Daily limit of {MAX_UPLOADS_PER_IP} uploads exceeded"
         )
     
-    conn.close()
     return client_ip
 
+def _delete_jobs_before(cutoff_time):
+    """Delete jobs created before cutoff_time, returning their (id, filename) rows"""
+    with db_transaction() as conn:
+        # Delete old jobs, getting their files back in the same statement
+        return conn.execute("""
+            DELETE FROM jobs 
+            WHERE created_at < ?
+            RETURNING id, filename
+        """, (cutoff_time,)).fetchall()
+
 # Background task to cleanup old files
 async def cleanup_old_files():
     """Remove files older than 24 hours"""
     while True:
         try:
             cutoff_time = datetime.now() - timedelta(hours=CLEANUP_AFTER_HOURS)
+            old_jobs = await asyncio.to_thread(_delete_jobs_before, cutoff_time)
             
-            # Find old jobs
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute("""
-                SELECT id, filename FROM jobs 
-                WHERE created_at < ?
-            """, (cutoff_time,))
-            
-            old_jobs = c.fetchall()
-            
-            # Delete files and records
+            # Delete files; a missing file is already cleaned up
             for job_id, filename in old_jobs:
-                file_path = UPLOAD_DIR / filename
-                if file_path.exists():
-                    file_path.unlink()
-                
-                c.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-            
-            conn.commit()
-            conn.close()
+                for directory in (UPLOAD_DIR, HOT_DIR):
+                    try:
+                        (directory / filename).unlink()
+                    except FileNotFoundError:
+                        pass
             
             # Sleep for 1 hour
             await asyncio.sleep(3600)
@@ -194,69 +340,133 @@ async def cleanup_old_files():
             print(f"Cleanup error: {e}")
             await asyncio.sleep(3600)
 
+# Decode audio in-process
+def _decode_16k_mono(path) -> np.ndarray:
+    """Decode an audio file to the 16 kHz mono float32 array Whisper expects"""
+    resampler = av.audio.resampler.AudioResampler(format="flt", layout="mono", rate=16000)
+    chunks = []
+    with av.open(str(path)) as container:
+        for frame in container.decode(audio=0):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        # Drain samples still buffered in the resampler
+        for out in resampler.resample(None):
+            chunks.append(out.to_ndarray().reshape(-1))
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+# Move processed uploads off tmpfs
+def _retire_upload(file_path: Path):
+    """Move a processed upload from HOT_DIR into UPLOAD_DIR, or delete it"""
+    try:
+        if not KEEP_UPLOADS:
+            file_path.unlink()
+        elif file_path.parent != UPLOAD_DIR:
+            shutil.move(file_path, UPLOAD_DIR / file_path.name)
+    except OSError as e:
+        print(f"Could not retire upload {file_path.name}: {e}")
+
 # Process audio with Whisper
-async def process_audio(job_id: str, file_path: Path):
-    """Process audio file with Whisper"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def _process_audio_blocking(job_id: str, file_path: Path):
+    """Process audio file with Whisper (runs in a worker thread)"""
+    conn = app.state.db
     
     try:
-        # Update status
-        c.execute("""
-            UPDATE jobs SET status = 'processing', progress = 10 
-            WHERE id = ?
-        """, (job_id,))
-        conn.commit()
+        # Record the start in SQLite, so /status polling and streams served
+        # by other worker processes see the job running
+        with db_lock:
+            conn.execute(
+                "UPDATE jobs SET status = 'processing', progress = 10 WHERE id = ?",
+                (job_id,)
+            )
         
         # Transcribe
         model = load_whisper_model()
+        audio = _decode_16k_mono(file_path)
+        
+        segments, info = model.transcribe(audio, **TRANSCRIBE_OPTIONS)
         
-        if USING_FASTER_WHISPER:
-            # faster-whisper
-            segments, info = model.transcribe(
-                str(file_path),
-                beam_size=5,
-                language="en",
-                condition_on_previous_text=False
+        # Segments are decoded lazily; push each one to status streams as it
+        # arrives so the page can show the transcript while the job runs.
+        # Segment text and progress are kept in memory only
+        parts = []
+        for segment in segments:
+            text = segment.text.strip()
+            parts.append(text)
+            progress = 10 + int(89 * min(1.0, segment.end / info.duration)) if info.duration else 50
+            app.state.loop.call_soon_threadsafe(
+                publish_status, job_id, "processing", progress, None, text
             )
-            
-            # Combine segments
-            result_text = " ".join([segment.text.strip() for segment in segments])
-            
-        else:
-            # openai-whisper
-            result = model.transcribe(str(file_path))
-            result_text = result["text"].strip()
+        result_text = " ".join(parts)
         
         # Update with result
-        c.execute("""
-            UPDATE jobs 
-            SET status = 'completed', 
-                progress = 100, 
-                result_text = ?,
-                completed_at = ?
-            WHERE id = ?
-        """, (result_text, datetime.now(), job_id))
+        with db_lock:
+            conn.execute("""
+                UPDATE jobs 
+                SET status = 'completed', 
+                    progress = 100, 
+                    result_text = ?,
+                    completed_at = ?
+                WHERE id = ?
+            """, (result_text, datetime.now(), job_id))
+        return "completed", None
         
     except Exception as e:
         # Update with error
-        c.execute("""
-            UPDATE jobs 
-            SET status = 'failed', 
-                error = ?,
-                completed_at = ?
-            WHERE id = ?
-        """, (str(e), datetime.now(), job_id))
+        with db_lock:
+            conn.execute("""
+                UPDATE jobs 
+                SET status = 'failed', 
+                    error = ?,
+                    completed_at = ?
+                WHERE id = ?
+            """, (str(e), datetime.now(), job_id))
+        return "failed", str(e)
     
     finally:
-        conn.commit()
-        conn.close()
+        _retire_upload(file_path)
+
+# Status push
+def publish_status(job_id: str, status: str, progress: int = 0, error: Optional[str] = None,
+                   segment: Optional[str] = None):
+    """Send a status update, optionally carrying a new transcript segment, to every stream watching this job"""
+    update = {"job_id": job_id, "status": status, "progress": progress, "error": error}
+    if status == "processing":
+        app.state.progress[job_id] = progress
+    else:
+        app.state.progress.pop(job_id, None)
+    if segment is not None:
+        update["segment"] = segment
+    for queue in app.state.subscribers.get(job_id, ()):
+        queue.put_nowait(update)
+
+# Transcription worker
+async def transcription_worker(queue: asyncio.Queue):
+    """Take queued jobs one at a time and transcribe them in a thread"""
+    while True:
+        job_id, file_path = await queue.get()
+        try:
+            # SQLite gets the start and the terminal state; progress and
+            # segment text are push-only
+            publish_status(job_id, "processing", 10)
+            status, error = await asyncio.to_thread(_process_audio_blocking, job_id, file_path)
+            publish_status(job_id, status, 100 if status == "completed" else 0, error)
+        except Exception as e:
+            print(f"Worker error on job {job_id}: {e}")
+        finally:
+            queue.task_done()
 
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page with upload form"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return HTMLResponse(
+            content=app.state.index_html_gz,
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    return HTMLResponse(content=app.state.index_html, headers={"Vary": "Accept-Encoding"})
 
 @app.post("/auth")
 async def authenticate(password: str):
@@ -264,12 +474,29 @@ async def authenticate(password: str):
     if password == DEMO_PASSWORD:
         response = JSONResponse({"status": "authenticated"})
         # Set cookie
-        auth_hash = hashlib.sha256(DEMO_PASSWORD.encode()).hexdigest()
-        response.set_cookie(key="demo_auth", value=auth_hash, max_age=86400)
+        response.set_cookie(key="demo_auth", value=DEMO_AUTH_HASH, max_age=86400)
         return response
     else:
         raise HTTPException(status_code=401, detail="Invalid password")
 
+def _record_upload(job_id: str, client_ip: str, filename: str, file_size: int):
+    """Create a queued job and count the upload against the client's daily limit"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    with db_transaction() as conn:
+        # Create job record
+        conn.execute("""
+            INSERT INTO jobs (id, ip_address, filename, file_size, status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (job_id, client_ip, filename, file_size, "queued", datetime.now()))
+        
+        # Update usage stats
+        conn.execute("""
+            INSERT INTO usage_stats (ip_address, date, upload_count)
+            VALUES (?, ?, 1)
+            ON CONFLICT(ip_address, date) 
+            DO UPDATE SET upload_count = upload_count + 1
+        """, (client_ip, today))
+
 @app.post("/upload")
 async def upload_audio(
     request: Request,
@@ -279,14 +506,6 @@ async def upload_audio(
 ):
     """Upload audio file for transcription"""
     
-    # Validate file size
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413, 
-            detail=f"File too large. Max size is {MAX_FILE_SIZE // 1024 // 1024}MB"
-        )
-    
     # Validate file type
     if not file.filename.lower().endswith(('.mp3', '.wav', '.m4a', '.mp4', '.ogg', '.flac')):
         raise HTTPException(
@@ -295,52 +514,45 @@ async def upload_audio(
         )
     
     # Generate job ID
-    job_id = hashlib.sha256(f"{client_ip}{datetime.now()}".encode()).hexdigest()[:12]
-    
-    # Save file
-    file_path = UPLOAD_DIR / f"{job_id}_{file.filename}"
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Create job record
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    job_id = secrets.token_hex(8)
+    file_path = HOT_DIR / f"{job_id}_{file.filename}"
     
-    c.execute("""
-        INSERT INTO jobs (id, ip_address, filename, file_size, status, created_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (job_id, client_ip, file_path.name, len(contents), "queued", datetime.now()))
-    
-    # Update usage stats
-    today = datetime.now().strftime("%Y-%m-%d")
-    c.execute("""
-        INSERT INTO usage_stats (ip_address, date, upload_count)
-        VALUES (?, ?, 1)
-        ON CONFLICT(ip_address, date) 
-        DO UPDATE SET upload_count = upload_count + 1
-    """, (client_ip, today))
+    # Stream the upload to disk in 1 MiB chunks, enforcing the size limit
+    file_size = 0
+    with open(file_path, "wb") as out:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                file_size += len(chunk)
+                if file_size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413, 
+                        detail=f"File too large. Max size is {MAX_FILE_SIZE // 1024 // 1024}MB"
+                    )
+                out.write(chunk)
+        except BaseException:
+            out.close()
+            file_path.unlink(missing_ok=True)
+            raise
     
-    conn.commit()
-    conn.close()
+    await asyncio.to_thread(_record_upload, job_id, client_ip, file_path.name, file_size)
     
-    # Start processing in background
-    asyncio.create_task(process_audio(job_id, file_path))
+    # Queue for background processing
+    await app.state.jobs.put((job_id, file_path))
     
     return {"job_id": job_id, "status": "queued"}
 
 @app.get("/status/{job_id}")
 async def get_status(job_id: str, auth: bool = Depends(check_demo_auth)):
     """Get job status"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    # Jobs running in this process report live progress from memory
+    progress = app.state.progress.get(job_id)
+    if progress is not None:
+        return {"job_id": job_id, "status": "processing", "progress": progress, "error": None}
     
-    c.execute("""
+    result = await asyncio.to_thread(db_fetchone, """
         SELECT status, progress, error FROM jobs WHERE id = ?
     """, (job_id,))
     
-    result = c.fetchone()
-    conn.close()
-    
     if not result:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -353,20 +565,64 @@ async def get_status(job_id: str, auth: bool = Depends(check_demo_auth)):
         "error": error
     }
 
+@app.get("/status/{job_id}/stream")
+async def stream_status(job_id: str, auth: bool = Depends(check_demo_auth)):
+    """Push job status changes as Server-Sent Events until the job finishes"""
+    # Subscribe before reading the current state so no transition is missed
+    updates = asyncio.Queue()
+    app.state.subscribers.setdefault(job_id, set()).add(updates)
+    
+    def unsubscribe():
+        watchers = app.state.subscribers.get(job_id)
+        if watchers is not None:
+            watchers.discard(updates)
+            if not watchers:
+                del app.state.subscribers[job_id]
+    
+    result = await asyncio.to_thread(db_fetchone, """
+        SELECT status, progress, error FROM jobs WHERE id = ?
+    """, (job_id,))
+    
+    if not result:
+        unsubscribe()
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    status, progress, error = result
+    
+    async def events():
+        try:
+            update = {"job_id": job_id, "status": status, "progress": progress, "error": error}
+            while True:
+                yield {"data": json.dumps(update)}
+                if update["status"] in ("completed", "failed"):
+                    break
+                while True:
+                    try:
+                        update = await asyncio.wait_for(updates.get(), STREAM_RECHECK_SECONDS)
+                        break
+                    except asyncio.TimeoutError:
+                        # The job may be running in another worker process
+                        row = await asyncio.to_thread(db_fetchone, """
+                            SELECT status, progress, error FROM jobs WHERE id = ?
+                        """, (job_id,))
+                        if not row:
+                            return
+                        if row[0] != update["status"]:
+                            update = {"job_id": job_id, **dict(zip(("status", "progress", "error"), row))}
+                            break
+        finally:
+            unsubscribe()
+    
+    return EventSourceResponse(events())
+
 @app.get("/result/{job_id}")
 async def get_result(job_id: str, auth: bool = Depends(check_demo_auth)):
     """Get transcription result"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    c.execute("""
+    result = await asyncio.to_thread(db_fetchone, """
         SELECT status, result_text, error, created_at, completed_at 
         FROM jobs WHERE id = ?
     """, (job_id,))
     
-    result = c.fetchone()
-    conn.close()
-    
     if not result:
         raise HTTPException(status_code=404, detail="Job not found")
     
@@ -400,5 +656,14 @@ async def health_check():
 
 # Run the app
 if __name__ == "__main__":
-    # For development
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # uvloop (from uvicorn[standard]) is not available on Windows
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    uvicorn.run(
+        "app_demo:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=WORKERS,
+        loop=loop,
+        http="httptools",
+        limit_concurrency=LIMIT_CONCURRENCY
+    )
\ No newline at end of file
@@ -208,6 +208,21 @@ resource "aws_dynamodb_table" "metadata" {
     type = "S"
   }
   
+  attribute {
+    name = "user_id"
+    type = "S"
+  }
+  
+  attribute {
+    name = "gsi_pk"
+    type = "S"
+  }
+  
+  attribute {
+    name = "created_at"
+    type = "S"
+  }
+  
   attribute {
     name = "ttl"
     type = "N"
@@ -226,6 +241,21 @@ resource "aws_dynamodb_table" "metadata" {
     projection_type = "ALL"
   }
   
+  # Global secondary index for per-user lookups (GDPR deletion)
+  global_secondary_index {
+    name            = "UserIndex"
+    hash_key        = "user_id"
+    projection_type = "ALL"
+  }
+  
+  # Global secondary index for listing lectures newest first
+  global_secondary_index {
+    name            = "DateIndex"
+    hash_key        = "gsi_pk"
+    range_key       = "created_at"
+    projection_type = "ALL"
+  }
+  
   # Point-in-time recovery
   point_in_time_recovery {
     enabled = true
@@ -4,12 +4,13 @@ Batch processing script for Whisper MOWD
 Process multiple audio files in a directory
 """
 
+import io
 import os
 import sys
 import argparse
 import logging
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 # Add the src directory to the Python path
@@ -17,6 +18,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import CLI module
 from src.cli import process_file
+from src.transcription.whisper_service import WhisperTranscriber, resolve_device, DEFAULT_BATCH_SIZE
+from src.transcription.utils import get_audio_duration, load_audio
 
 # Setup logging
 logging.basicConfig(
@@ -25,6 +28,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger("batch-processor")
 
+# Define supported extensions
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg', '.flac')
+VIDEO_EXTENSIONS = ('.mp4', '.mkv', '.avi', '.mov', '.flv', '.webm')
+SUPPORTED_EXTENSIONS = frozenset(AUDIO_EXTENSIONS + VIDEO_EXTENSIONS)
+
+# Results buffered before the report file is written
+REPORT_FLUSH_EVERY = 20
+
 def find_audio_files(directory, recursive=False):
     """
     Find audio files in a directory
@@ -33,34 +44,49 @@ def find_audio_files(directory, recursive=False):
         directory: Directory to search
         recursive: Whether to search recursively
         
-    Returns:
-        List of file paths
+    Yields:
+        Paths of supported audio and video files
     """
-    directory = Path(directory)
+    # Walk with scandir so rejected entries never become Path objects
+    def walk(path):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        yield from walk(entry.path)
+                    continue
+                name = entry.name
+                dot = name.rfind('.')
+                if dot > 0 and name[dot:].lower() in SUPPORTED_EXTENSIONS:
+                    yield Path(entry.path)
     
-    # Define supported extensions
-    AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.ogg', '.flac']
-    VIDEO_EXTENSIONS = ['.mp4', '.mkv', '.avi', '.mov', '.flv', '.webm']
-    SUPPORTED_EXTENSIONS = AUDIO_EXTENSIONS + VIDEO_EXTENSIONS
-    
-    # Find files
-    if recursive:
-        all_files = list(directory.glob('**/*.*'))
-    else:
-        all_files = list(directory.glob('*.*'))
+    return walk(directory)
+
+def sort_by_duration(audio_files, workers):
+    """
+    Order files longest first so parallel workers finish at about the same time
     
-    # Filter by extension
-    audio_files = [f for f in all_files if f.suffix.lower() in SUPPORTED_EXTENSIONS]
+    Args:
+        audio_files: List of file paths
+        workers: Number of threads to probe durations with
+        
+    Returns:
+        List of file paths; files whose duration can't be read go last
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        durations = list(executor.map(get_audio_duration, audio_files))
     
-    return audio_files
+    ranked = sorted(zip(audio_files, durations), key=lambda item: item[1] or 0, reverse=True)
+    return [file for file, _ in ranked]
 
-def process_single_file(file_path, args):
+def process_single_file(file_path, args, transcriber=None):
     """
     Process a single file with error handling
     
     Args:
         file_path: Path to the file
         args: Command-line arguments
+        transcriber: Shared WhisperTranscriber (a new one is loaded if None)
         
     Returns:
         Dictionary with result information
@@ -73,6 +99,9 @@ def process_single_file(file_path, args):
         else:
             lecture_id = None
             
+        # Decode once up front; for videos this reads only the audio stream
+        audio = load_audio(file_path)
+        
         # Process the file
         result = process_file(
             file_path=file_path,
@@ -81,7 +110,9 @@ def process_single_file(file_path, args):
             summarizer_type=args.summarizer,
             storage_mode=args.storage,
             lecture_id=lecture_id,
-            convert_format=args.format
+            convert_format=args.format,
+            transcriber=transcriber,
+            audio=audio
         )
         
         return {'status': 'success', 'file': file_path, 'lecture_id': result['lecture_id']}
@@ -90,6 +121,85 @@ def process_single_file(file_path, args):
         logger.error(f"Error processing {file_path}: {e}")
         return {'status': 'error', 'file': file_path, 'error': str(e)}
 
+# Per-process transcriber for CPU runs on a ProcessPoolExecutor
+_worker_transcriber = None
+
+def _init_worker(model_size, threads, vad_parameters, compute_type, batch_size):
+    """
+    Set up a worker process with its own model and OpenMP thread budget
+    
+    Args:
+        model_size: Whisper model size
+        threads: CPU threads for this process's model
+        vad_parameters: Silero VAD options for the transcriber
+        compute_type: CTranslate2 compute type, or "auto"
+        batch_size: Speech chunks decoded per forward pass
+    """
+    global _worker_transcriber
+    # The thread count is passed to the model directly: with fork, OpenMP
+    # was already initialised in the parent, so OMP_NUM_THREADS set here
+    # would have no effect
+    _worker_transcriber = WhisperTranscriber(
+        model_size=model_size, device="cpu", compute_type=compute_type,
+        vad_parameters=vad_parameters, batch_size=batch_size, cpu_threads=threads
+    )
+
+def _process_in_worker(file_path, args):
+    """Process a file with the current worker process's transcriber"""
+    return process_single_file(file_path, args, transcriber=_worker_transcriber)
+
+def run_batch(audio_files, args, model_size, device):
+    """
+    Process files with the executor that suits the device
+    
+    Args:
+        audio_files: List of file paths, in submission order
+        args: Command-line arguments
+        model_size: Whisper model size
+        device: Resolved inference device ("cpu" or "cuda")
+        
+    Yields:
+        Result dictionaries from process_single_file, as each file finishes
+    """
+    # Silence is dropped by VAD before it reaches the encoder
+    vad_parameters = dict(
+        threshold=args.vad_threshold,
+        min_silence_duration_ms=args.vad_min_silence_ms
+    )
+    
+    if args.workers > 1 and device == "cpu":
+        # On CPU, separate processes give each model its own OpenMP pool
+        # and keep the Python glue from contending on one GIL
+        threads = max(1, (os.cpu_count() or 1) // args.workers)
+        print(f"Processing files with {args.workers} worker processes ({threads} threads each)")
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(model_size, threads, vad_parameters, args.compute_type, args.batch_size)
+        ) as executor:
+            futures = [executor.submit(_process_in_worker, file, args) for file in audio_files]
+            for future in as_completed(futures):
+                yield future.result()
+        return
+    
+    # Load the model once and share it across all files; CTranslate2 runs
+    # up to num_workers transcriptions on it concurrently
+    transcriber = WhisperTranscriber(
+        model_size=model_size, device=device, compute_type=args.compute_type,
+        num_workers=args.workers, vad_parameters=vad_parameters, batch_size=args.batch_size
+    )
+    
+    if args.workers > 1:
+        print(f"Processing files with {args.workers} worker threads")
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(process_single_file, file, args, transcriber) for file in audio_files]
+            for future in as_completed(futures):
+                yield future.result()
+    else:
+        print("Processing files sequentially")
+        for file in audio_files:
+            yield process_single_file(file, args, transcriber)
+
 def main():
     """Main function for batch processing"""
     parser = argparse.ArgumentParser(description="Batch process lecture audio files with Whisper MOWD")
@@ -108,12 +218,23 @@ def main():
                         help="Use parent folder name in lecture ID")
     parser.add_argument("--workers", type=int, default=1,
                         help="Number of worker threads (default: 1)")
+    parser.add_argument("--vad-threshold", type=float, default=0.5,
+                        help="Speech probability above which audio counts as voiced (default: 0.5)")
+    parser.add_argument("--vad-min-silence-ms", type=int, default=500,
+                        help="Shortest silence, in ms, that VAD cuts out (default: 500)")
+    parser.add_argument("--device", default="auto", choices=["auto", "cpu", "cuda"],
+                        help="Device to use for inference (default: auto)")
+    parser.add_argument("--compute-type", default="auto",
+                        choices=["auto", "int8", "int8_float32", "int8_float16", "float16", "float32"],
+                        help="Compute type for inference (default: fastest the device supports)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Speech chunks decoded together per file; 1 disables batching (default: 8)")
     
     args = parser.parse_args()
     
     try:
         # Find audio files
-        audio_files = find_audio_files(args.directory, args.recursive)
+        audio_files = list(find_audio_files(args.directory, args.recursive))
         
         if not audio_files:
             print(f"No audio files found in {args.directory}")
@@ -124,48 +245,53 @@ def main():
         # Create output directory
         os.makedirs(args.output, exist_ok=True)
         
-        # Process files in parallel if requested
-        results = []
-        if args.workers > 1:
-            print(f"Processing files with {args.workers} worker threads")
-            with ThreadPoolExecutor(max_workers=args.workers) as executor:
-                futures = [executor.submit(process_single_file, file, args) for file in audio_files]
-                for future in futures:
-                    results.append(future.result())
-        else:
-            print("Processing files sequentially")
-            for file in audio_files:
-                results.append(process_single_file(file, args))
-        
-        # Count successes and failures
-        successes = [r for r in results if r['status'] == 'success']
-        failures = [r for r in results if r['status'] == 'error']
+        model_size = args.model or os.getenv("WHISPER_MODEL_SIZE", "base")
+        device = resolve_device(args.device)
         
-        # Print summary
-        print("\nBatch processing completed!")
-        print(f"Total files: {len(audio_files)}")
-        print(f"Successful: {len(successes)}")
-        print(f"Failed: {len(failures)}")
+        if args.workers > 1:
+            # Starting the longest files first keeps one long lecture from
+            # running alone at the end while the other workers sit idle
+            audio_files = sort_by_duration(audio_files, args.workers)
         
-        # Write report
+        # Record results as files finish, so a killed run still leaves a
+        # report of what completed; lines are buffered and written out every
+        # REPORT_FLUSH_EVERY results rather than one write per line
+        successes = 0
+        failures = 0
         report_path = Path(args.output) / f"batch_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(f"Batch Processing Report\n")
-            f.write(f"======================\n\n")
-            f.write(f"Date: {datetime.now().isoformat()}\n")
-            f.write(f"Directory: {args.directory}\n")
-            f.write(f"Model: {args.model}\n")
-            f.write(f"Summarizer: {args.summarizer}\n\n")
+            buf = io.StringIO()
+            buf.write(f"Batch Processing Report\n")
+            buf.write(f"======================\n\n")
+            buf.write(f"Date: {datetime.now().isoformat()}\n")
+            buf.write(f"Directory: {args.directory}\n")
+            buf.write(f"Model: {args.model}\n")
+            buf.write(f"Summarizer: {args.summarizer}\n\n")
+            buf.write(f"Results:\n")
             
-            f.write(f"Successful ({len(successes)}):\n")
-            for result in successes:
-                f.write(f"  - {result['file'].name} -> {result['lecture_id']}\n")
+            for count, result in enumerate(run_batch(audio_files, args, model_size, device), 1):
+                if result['status'] == 'success':
+                    successes += 1
+                    buf.write(f"  - {result['file'].name} -> {result['lecture_id']}\n")
+                else:
+                    failures += 1
+                    buf.write(f"  - {result['file'].name}: FAILED: {result['error']}\n")
+                
+                if count % REPORT_FLUSH_EVERY == 0:
+                    f.write(buf.getvalue())
+                    f.flush()
+                    buf.seek(0)
+                    buf.truncate()
             
-            if failures:
-                f.write(f"\nFailed ({len(failures)}):\n")
-                for result in failures:
-                    f.write(f"  - {result['file'].name}: {result['error']}\n")
+            buf.write(f"\nSuccessful: {successes}\n")
+            buf.write(f"Failed: {failures}\n")
+            f.write(buf.getvalue())
         
+        # Print summary
+        print("\nBatch processing completed!")
+        print(f"Total files: {len(audio_files)}")
+        print(f"Successful: {successes}")
+        print(f"Failed: {failures}")
         print(f"Report saved to: {report_path}")
         
         # Return error code if any failures
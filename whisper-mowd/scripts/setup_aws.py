@@ -8,9 +8,10 @@ import os
 import sys
 import argparse
 import logging
-import boto3
+import functools
+from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
 
 # Setup logging
 logging.basicConfig(
@@ -19,8 +20,210 @@ logging.basicConfig(
 )
 logger = logging.getLogger("aws-setup")
 
-# Load environment variables
-load_dotenv()
+# Keep connections alive between the back-to-back setup calls, and retry
+# throttled control-plane requests with client-side rate limiting
+BOTO_CFG = dict(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+# Resource settings that are the same for every environment
+PROJECT_TAG = {'Key': 'Project', 'Value': 'MOWD-Whisper'}
+
+# DateIndex partition key value; must match LECTURE_PARTITION in
+# src/storage/secure_aws_storage.py
+LECTURE_PARTITION = 'LECTURE'
+
+ENCRYPTION_CONFIG = {
+    'Rules': [
+        {
+            'ApplyServerSideEncryptionByDefault': {
+                'SSEAlgorithm': 'AES256'
+            },
+            'BucketKeyEnabled': True
+        }
+    ]
+}
+
+PUBLIC_ACCESS_BLOCK_CONFIG = {
+    'BlockPublicAcls': True,
+    'IgnorePublicAcls': True,
+    'BlockPublicPolicy': True,
+    'RestrictPublicBuckets': True
+}
+
+TABLE_KEY_SCHEMA = [
+    {
+        'AttributeName': 'lecture_id',
+        'KeyType': 'HASH'  # Partition key
+    }
+]
+
+TABLE_ATTRIBUTE_DEFINITIONS = [
+    {
+        'AttributeName': 'lecture_id',
+        'AttributeType': 'S'
+    },
+    {
+        'AttributeName': 'school_id',
+        'AttributeType': 'S'
+    },
+    {
+        'AttributeName': 'user_id',
+        'AttributeType': 'S'
+    },
+    {
+        'AttributeName': 'gsi_pk',
+        'AttributeType': 'S'
+    },
+    {
+        'AttributeName': 'created_at',
+        'AttributeType': 'S'
+    }
+]
+
+TABLE_INDEXES = [
+    {
+        'IndexName': 'SchoolIndex',
+        'KeySchema': [
+            {
+                'AttributeName': 'school_id',
+                'KeyType': 'HASH'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        }
+    },
+    {
+        # Lets GDPR deletion find a user's lectures without a table scan
+        'IndexName': 'UserIndex',
+        'KeySchema': [
+            {
+                'AttributeName': 'user_id',
+                'KeyType': 'HASH'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        }
+    },
+    {
+        # Every lecture shares one gsi_pk, so listing the newest lectures is
+        # a range read on created_at rather than a table scan
+        'IndexName': 'DateIndex',
+        'KeySchema': [
+            {
+                'AttributeName': 'gsi_pk',
+                'KeyType': 'HASH'
+            },
+            {
+                'AttributeName': 'created_at',
+                'KeyType': 'RANGE'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        }
+    }
+]
+
+def _tags(env):
+    """Build the resource tag list for an environment"""
+    return [PROJECT_TAG, {'Key': 'Environment', 'Value': env}]
+
+# boto3 is imported on first use so --help and argument errors stay instant
+@functools.lru_cache(maxsize=None)
+def _session():
+    """Get the session shared by all clients, so credentials are resolved once"""
+    import boto3
+    return boto3.session.Session()
+
+@functools.lru_cache(maxsize=None)
+def _client(service, region):
+    """
+    Get a shared AWS client, building it on first use
+    
+    Args:
+        service: AWS service name ('s3', 'dynamodb')
+        region: AWS region
+        
+    Returns:
+        boto3 client for the service and region
+    """
+    from botocore.config import Config
+    return _session().client(service, region_name=region, config=Config(**BOTO_CFG))
+
+def configure_bucket(s3, bucket_name, purpose, region, env, block_public_access=True):
+    """
+    Create one S3 bucket and apply its versioning, encryption, tags and access settings
+    
+    Args:
+        s3: S3 client
+        bucket_name: Name of the bucket to create
+        purpose: What the bucket holds (for logging)
+        region: AWS region
+        env: Environment name (dev, staging, prod)
+        block_public_access: Whether to block all public access to the bucket
+    """
+    try:
+        logger.info(f"Creating S3 bucket {bucket_name} for {purpose}...")
+        
+        # CreateBucketConfiguration is required for regions other than us-east-1;
+        # ACLs are disabled at creation so the bucket owner owns every object
+        try:
+            if region == 'us-east-1':
+                s3.create_bucket(Bucket=bucket_name, ObjectOwnership='BucketOwnerEnforced')
+            else:
+                s3.create_bucket(
+                    Bucket=bucket_name,
+                    CreateBucketConfiguration={'LocationConstraint': region},
+                    ObjectOwnership='BucketOwnerEnforced'
+                )
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            # Re-run: an earlier run may have applied only some settings, so
+            # apply them all again; every put below is idempotent
+            logger.info(f"Bucket {bucket_name} already exists, applying configuration")
+        
+        # The remaining settings are independent of each other once the
+        # bucket exists, so issue them concurrently
+        calls = [
+            # Enable versioning
+            (s3.put_bucket_versioning, dict(
+                Bucket=bucket_name,
+                VersioningConfiguration={'Status': 'Enabled'}
+            )),
+            # Enable encryption
+            (s3.put_bucket_encryption, dict(
+                Bucket=bucket_name,
+                ServerSideEncryptionConfiguration=ENCRYPTION_CONFIG
+            )),
+            # Add tags
+            (s3.put_bucket_tagging, dict(
+                Bucket=bucket_name,
+                Tagging={'TagSet': _tags(env)}
+            )),
+        ]
+        
+        # Block public access for audio and transcript buckets
+        if block_public_access:
+            calls.append((s3.put_public_access_block, dict(
+                Bucket=bucket_name,
+                PublicAccessBlockConfiguration=PUBLIC_ACCESS_BLOCK_CONFIG
+            )))
+        
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = [executor.submit(call, **kwargs) for call, kwargs in calls]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in done:
+                future.result()
+        
+        logger.info(f"Successfully created bucket: {bucket_name}")
+        
+    except Exception as e:
+        logger.error(f"Error creating bucket {bucket_name}: {e}")
+        raise
 
 def setup_s3_buckets(region, env, create_state_bucket=False):
     """
@@ -34,7 +237,7 @@ def setup_s3_buckets(region, env, create_state_bucket=False):
     Returns:
         Dictionary with bucket names
     """
-    s3 = boto3.client('s3', region_name=region)
+    s3 = _client('s3', region)
     
     # Bucket names
     audio_bucket = f"mowd-whisper-lectures-{env}"
@@ -49,74 +252,17 @@ def setup_s3_buckets(region, env, create_state_bucket=False):
     if create_state_bucket:
         buckets_to_create.append((state_bucket, "Terraform state"))
     
-    # Create buckets
-    for bucket_name, purpose in buckets_to_create:
-        try:
-            logger.info(f"Creating S3 bucket {bucket_name} for {purpose}...")
-            
-            # CreateBucketConfiguration is required for regions other than us-east-1
-            if region == 'us-east-1':
-                s3.create_bucket(Bucket=bucket_name)
-            else:
-                s3.create_bucket(
-                    Bucket=bucket_name,
-                    CreateBucketConfiguration={'LocationConstraint': region}
-                )
-            
-            # Enable versioning
-            s3.put_bucket_versioning(
-                Bucket=bucket_name,
-                VersioningConfiguration={'Status': 'Enabled'}
-            )
-            
-            # Enable encryption
-            s3.put_bucket_encryption(
-                Bucket=bucket_name,
-                ServerSideEncryptionConfiguration={
-                    'Rules': [
-                        {
-                            'ApplyServerSideEncryptionByDefault': {
-                                'SSEAlgorithm': 'AES256'
-                            }
-                        }
-                    ]
-                }
-            )
-            
-            # Add tags
-            s3.put_bucket_tagging(
-                Bucket=bucket_name,
-                Tagging={
-                    'TagSet': [
-                        {
-                            'Key': 'Project',
-                            'Value': 'MOWD-Whisper'
-                        },
-                        {
-                            'Key': 'Environment',
-                            'Value': env
-                        }
-                    ]
-                }
+    # Create buckets in parallel; the shared client is thread-safe
+    with ThreadPoolExecutor(max_workers=len(buckets_to_create)) as executor:
+        futures = [
+            executor.submit(
+                configure_bucket, s3, bucket_name, purpose, region, env,
+                block_public_access=bucket_name != state_bucket
             )
-            
-            # Block public access for audio and transcript buckets
-            if bucket_name != state_bucket:
-                s3.put_public_access_block(
-                    Bucket=bucket_name,
-                    PublicAccessBlockConfiguration={
-                        'BlockPublicAcls': True,
-                        'IgnorePublicAcls': True,
-                        'BlockPublicPolicy': True,
-                        'RestrictPublicBuckets': True
-                    }
-                )
-            
-            logger.info(f"Successfully created bucket: {bucket_name}")
-            
-        except Exception as e:
-            logger.error(f"Error creating bucket {bucket_name}: {e}")
-            raise
+            for bucket_name, purpose in buckets_to_create
+        ]
+        for future in futures:
+            future.result()
     
     return {
         'audio_bucket': audio_bucket,
@@ -135,7 +281,7 @@ def setup_dynamodb_table(region, env):
     Returns:
         Table name
     """
-    dynamodb = boto3.client('dynamodb', region_name=region)
+    dynamodb = _client('dynamodb', region)
     
     # Table name
     table_name = f"mowd-whisper-metadata-{env}"
@@ -146,59 +292,20 @@ def setup_dynamodb_table(region, env):
         # Create table
         response = dynamodb.create_table(
             TableName=table_name,
-            KeySchema=[
-                {
-                    'AttributeName': 'lecture_id',
-                    'KeyType': 'HASH'  # Partition key
-                }
-            ],
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'lecture_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'school_id',
-                    'AttributeType': 'S'
-                }
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'SchoolIndex',
-                    'KeySchema': [
-                        {
-                            'AttributeName': 'school_id',
-                            'KeyType': 'HASH'
-                        }
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
+            KeySchema=TABLE_KEY_SCHEMA,
+            AttributeDefinitions=TABLE_ATTRIBUTE_DEFINITIONS,
+            GlobalSecondaryIndexes=TABLE_INDEXES,
             BillingMode='PAY_PER_REQUEST',
-            Tags=[
-                {
-                    'Key': 'Project',
-                    'Value': 'MOWD-Whisper'
-                },
-                {
-                    'Key': 'Environment',
-                    'Value': env
-                }
-            ]
+            Tags=_tags(env)
         )
         
         logger.info(f"Successfully created DynamoDB table: {table_name}")
         logger.info("Waiting for table to become active...")
         
-        # Wait for table to be created
+        # Wait for table to be created; on-demand tables are usually ACTIVE
+        # within seconds, so poll far more often than the 20s default
         waiter = dynamodb.get_waiter('table_exists')
-        waiter.wait(TableName=table_name)
+        waiter.wait(TableName=table_name, WaiterConfig={'Delay': 2, 'MaxAttempts': 30})
         
         return table_name
         
@@ -206,6 +313,54 @@ def setup_dynamodb_table(region, env):
         logger.error(f"Error creating DynamoDB table {table_name}: {e}")
         raise
 
+def backfill_date_index(region, env):
+    """
+    Tag metadata items written before the DateIndex existed with its partition key
+    
+    list_lectures only reads the DateIndex, so items without gsi_pk don't
+    show up in listings until this has been run once against the table.
+    
+    Args:
+        region: AWS region
+        env: Environment name (dev, staging, prod)
+        
+    Returns:
+        Number of items updated
+    """
+    dynamodb = _client('dynamodb', region)
+    table_name = f"mowd-whisper-metadata-{env}"
+    now = datetime.utcnow().isoformat()
+    updated = 0
+    
+    logger.info(f"Backfilling DateIndex keys in {table_name}...")
+    
+    pages = dynamodb.get_paginator('scan').paginate(
+        TableName=table_name,
+        ProjectionExpression='lecture_id',
+        FilterExpression='attribute_not_exists(gsi_pk)'
+    )
+    for page in pages:
+        for item in page.get('Items', []):
+            # The index is sparse on created_at too, so give very old items
+            # one; the condition skips items deleted since the scan
+            try:
+                dynamodb.update_item(
+                    TableName=table_name,
+                    Key={'lecture_id': item['lecture_id']},
+                    UpdateExpression='SET gsi_pk = :pk, created_at = if_not_exists(created_at, :now)',
+                    ConditionExpression='attribute_exists(lecture_id)',
+                    ExpressionAttributeValues={
+                        ':pk': {'S': LECTURE_PARTITION},
+                        ':now': {'S': now}
+                    }
+                )
+            except dynamodb.exceptions.ConditionalCheckFailedException:
+                continue
+            updated += 1
+    
+    logger.info(f"Backfilled {updated} items in {table_name}")
+    return updated
+
 def update_env_file(buckets, table_name, region, env):
     """
     Update .env file with AWS resource information
@@ -233,15 +388,23 @@ def update_env_file(buckets, table_name, region, env):
             'DYNAMODB_TABLE': table_name
         }
         
-        # Remove existing settings
+        # Rewrite existing settings in place in one pass, dropping any
+        # duplicates; comments and other keys are kept as they are
+        pending = dict(settings)
         new_lines = []
         for line in lines:
-            key = line.split('=')[0].strip() if '=' in line else ''
-            if key not in settings:
-                new_lines.append(line)
+            key, sep, _ = line.partition('=')
+            key = key.strip()
+            if sep and key in settings:
+                if key in pending:
+                    new_lines.append(f"{key}={pending.pop(key)}\n")
+                continue
+            new_lines.append(line)
         
-        # Add new settings
-        for key, value in settings.items():
+        # Add settings the file didn't have yet
+        if pending and new_lines and not new_lines[-1].endswith('\n'):
+            new_lines[-1] += '\n'
+        for key, value in pending.items():
             new_lines.append(f"{key}={value}\n")
         
         # Write updated .env file
@@ -272,7 +435,7 @@ def update_env_file(buckets, table_name, region, env):
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(description="Set up AWS resources for Whisper MOWD")
-    parser.add_argument("--region", default=os.getenv("AWS_REGION", "us-east-1"),
+    parser.add_argument("--region", default=None,
                         help="AWS region (default: from env or us-east-1)")
     parser.add_argument("--environment", default="dev", choices=["dev", "staging", "prod"],
                         help="Environment name (default: dev)")
@@ -280,17 +443,33 @@ def main():
                         help="Create S3 bucket for Terraform state")
     parser.add_argument("--update-env", action="store_true",
                         help="Update .env file with resource information")
+    parser.add_argument("--backfill-date-index", action="store_true",
+                        help="Only tag existing metadata items so lecture listings include them")
     
     args = parser.parse_args()
     
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    args.region = args.region or os.getenv("AWS_REGION", "us-east-1")
+    
     try:
-        print(f"Setting up AWS resources for Whisper MOWD in {args.region} ({args.environment})...")
+        if args.backfill_date_index:
+            count = backfill_date_index(args.region, args.environment)
+            print(f"Backfilled DateIndex keys on {count} metadata items")
+            return 0
         
-        # Create S3 buckets
-        buckets = setup_s3_buckets(args.region, args.environment, args.terraform_state)
+        print(f"Setting up AWS resources for Whisper MOWD in {args.region} ({args.environment})...")
         
-        # Create DynamoDB table
-        table_name = setup_dynamodb_table(args.region, args.environment)
+        # The buckets and the table don't depend on each other, so create
+        # them side by side; the table's ACTIVE wait overlaps the S3 calls
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            buckets_future = executor.submit(
+                setup_s3_buckets, args.region, args.environment, args.terraform_state
+            )
+            table_future = executor.submit(setup_dynamodb_table, args.region, args.environment)
+            buckets = buckets_future.result()
+            table_name = table_future.result()
         
         # Update .env file if requested
         if args.update_env:
@@ -3,18 +3,27 @@ JWT Validator Middleware
 Validates Cognito-issued JWTs for API requests
 """
 
-import json
 import time
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from functools import wraps
 import jwt
 from jwt import PyJWKClient
 import os
 
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+    _dumps = json.dumps
+
 # Setup logging
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = logging.getLogger("jwt-validator")
 
 # Configuration
 REGION = os.environ.get('AWS_REGION', 'us-east-1')
@@ -24,8 +33,61 @@ CLIENT_ID = os.environ['COGNITO_CLIENT_ID']
 # Cognito JWKS URL
 JWKS_URL = f'https://cognito-idp.{REGION}.amazonaws.com/{USER_POOL_ID}/.well-known/jwks.json'
 
-# Initialize JWKS client with caching
-jwks_client = PyJWKClient(JWKS_URL, cache_keys=True, lifespan=3600)
+# Claim checks applied to every token
+VALID_ROLES = frozenset(('admin', 'teacher', 'student', 'viewer'))
+VALID_TOKEN_USES = frozenset(('id', 'access'))
+REQUIRED_CLAIMS = ('exp', 'iat', 'auth_time', 'cognito:username')
+
+_DECODE_OPTIONS = {
+    "verify_signature": True,
+    "verify_exp": True,
+    "verify_nbf": True,
+    "verify_iat": True,
+    "verify_aud": True,
+    "verify_iss": True,
+    "require": list(REQUIRED_CLAIMS)
+}
+
+# How long a fetched key set, and any key taken from it, is trusted before
+# going back to Cognito; keys rotated out or revoked stop validating after this
+JWKS_LIFESPAN = 3600  # seconds
+
+# Public keys by key ID, already converted for signature verification
+_signing_keys = {}  # kid -> (expires-at monotonic time, key)
+
+# Verified claims are reused for repeat requests carrying the same token,
+# skipping the RSA signature check until shortly before the token expires
+CLAIMS_CACHE_SIZE = 1024
+CLAIMS_CACHE_MARGIN = 30  # seconds
+_claims_cache = OrderedDict()  # token digest -> (cache-until timestamp, claims)
+
+# Initialize JWKS client with a cached key set; per-key caching is left to
+# _signing_keys, since the client's own key cache never expires
+jwks_client = PyJWKClient(JWKS_URL, cache_keys=False, lifespan=JWKS_LIFESPAN)
+
+# Fetch the key set while the container initializes, so the first request
+# doesn't pay the round-trip to Cognito; on failure it's fetched on demand
+try:
+    jwks_client.get_jwk_set()
+except Exception as e:
+    logger.warning("Could not prefetch JWKS: %s", e)
+
+def _refresh_signing_key(kid: str, signing_key: Any) -> None:
+    """
+    Cache a key just taken from the JWKS, dropping expired entries
+    
+    Args:
+        kid: Key ID from the token header
+        signing_key: Public key matching kid
+    """
+    now = time.monotonic()
+    for stale_kid in [k for k, (expires_at, _) in _signing_keys.items() if expires_at <= now]:
+        del _signing_keys[stale_kid]
+    _signing_keys[kid] = (now + JWKS_LIFESPAN, signing_key)
+
+class AuthError(Exception):
+    """Raised when a request's token fails validation"""
+    pass
 
 class JWTValidator:
     """
@@ -49,75 +111,93 @@ class JWTValidator:
             Decoded token claims
             
         Raises:
-            Exception: If token is invalid
+            AuthError: If token is invalid
         """
+        now = time.time()
+        cache_key = hashlib.sha256(token.encode()).digest()[:16]
+        cached = _claims_cache.get(cache_key)
+        if cached is not None:
+            if cached[0] > now:
+                _claims_cache.move_to_end(cache_key)
+                # A copy, so a handler changing its claims can't alter
+                # what later requests with this token receive
+                return dict(cached[1])
+            _claims_cache.pop(cache_key, None)
+        
         try:
-            # Get the signing key from JWKS
-            signing_key = jwks_client.get_signing_key_from_jwt(token)
+            # Get the signing key, going to JWKS only for key IDs not seen
+            # within the last JWKS_LIFESPAN
+            kid = jwt.get_unverified_header(token).get('kid')
+            cached_key = _signing_keys.get(kid)
+            if cached_key is not None and cached_key[0] > time.monotonic():
+                signing_key = cached_key[1]
+            else:
+                signing_key = jwks_client.get_signing_key(kid).key
+                _refresh_signing_key(kid, signing_key)
             
             # Decode and verify the token
             claims = jwt.decode(
                 token,
-                signing_key.key,
+                signing_key,
                 algorithms=["RS256"],
                 audience=self.client_id,
                 issuer=self.issuer,
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "verify_nbf": True,
-                    "verify_iat": True,
-                    "verify_aud": True,
-                    "verify_iss": True,
-                    "require": ["exp", "iat", "auth_time", "cognito:username"]
-                }
+                options=_DECODE_OPTIONS,
+                leeway=0
             )
             
-            # Additional validation
-            self._validate_claims(claims)
-            
-            return claims
-            
         except jwt.ExpiredSignatureError:
             logger.error("Token has expired")
-            raise Exception("Token has expired")
-        except jwt.InvalidTokenError as e:
-            logger.error(f"Invalid token: {str(e)}")
-            raise Exception(f"Invalid token: {str(e)}")
-        except Exception as e:
-            logger.error(f"Token validation error: {str(e)}")
-            raise Exception(f"Token validation failed: {str(e)}")
+            raise AuthError("Token has expired") from None
+        except jwt.PyJWTError as e:
+            logger.error("Invalid token: %s", e)
+            raise AuthError(f"Invalid token: {e}") from None
+        
+        # Additional validation
+        self._validate_claims(claims, now)
+        
+        # Cache until the token expires or the 24 hour re-authentication
+        # limit is reached, whichever comes first
+        cache_until = min(claims['exp'], claims['auth_time'] + 86400) - CLAIMS_CACHE_MARGIN
+        _claims_cache[cache_key] = (cache_until, claims)
+        if len(_claims_cache) > CLAIMS_CACHE_SIZE:
+            _claims_cache.popitem(last=False)
+        
+        return dict(claims)
     
-    def _validate_claims(self, claims: Dict[str, Any]) -> None:
+    def _validate_claims(self, claims: Dict[str, Any], now: float) -> None:
         """
         Perform additional claim validation
         
         Args:
             claims: Decoded JWT claims
+            now: Current time, as read at the start of validation
             
         Raises:
-            Exception: If claims are invalid
+            AuthError: If claims are invalid
         """
         # Check token use
-        if claims.get('token_use') not in ['id', 'access']:
-            raise Exception("Invalid token_use claim")
+        if claims.get('token_use') not in VALID_TOKEN_USES:
+            raise AuthError("Invalid token_use claim")
         
         # Check authentication time (max 24 hours)
         auth_time = claims.get('auth_time', 0)
-        if time.time() - auth_time > 86400:
-            raise Exception("Authentication too old, please re-authenticate")
+        if now - auth_time > 86400:
+            raise AuthError("Authentication too old, please re-authenticate")
         
         # Validate custom attributes
         if 'custom:school_id' not in claims:
-            raise Exception("Missing required school_id attribute")
+            raise AuthError("Missing required school_id attribute")
         
         if 'custom:role' not in claims:
-            raise Exception("Missing required role attribute")
+            raise AuthError("Missing required role attribute")
         
         # Validate role values
-        valid_roles = ['admin', 'teacher', 'student', 'viewer']
-        if claims['custom:role'] not in valid_roles:
-            raise Exception(f"Invalid role: {claims['custom:role']}")
+        if claims['custom:role'] not in VALID_ROLES:
+            raise AuthError(f"Invalid role: {claims['custom:role']}")
+
+# Shared by every request handled in this container
+_VALIDATOR = JWTValidator()
 
 def extract_token(event: Dict[str, Any]) -> Optional[str]:
     """
@@ -129,21 +209,61 @@ def extract_token(event: Dict[str, Any]) -> Optional[str]:
     Returns:
         JWT token string or None
     """
-    # Check Authorization header
-    headers = event.get('headers', {})
+    # Check Authorization header; API Gateway sends null, not {}, when
+    # there are no headers or query parameters
+    headers = event.get('headers') or {}
     auth_header = headers.get('Authorization') or headers.get('authorization')
     
     if auth_header and auth_header.startswith('Bearer '):
         return auth_header[7:]
     
     # Check for token in query parameters (not recommended)
-    query_params = event.get('queryStringParameters', {})
-    if query_params and 'token' in query_params:
+    token = (event.get('queryStringParameters') or {}).get('token')
+    if token:
         logger.warning("Token passed in query parameters - security risk")
-        return query_params['token']
+        return token
     
     return None
 
+_MISSING_TOKEN_RESPONSE = {
+    'statusCode': 401,
+    'body': _dumps({'error': 'Missing authentication token'})
+}
+
+def _authenticate(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Validate the request's token and add the user's claims to the event
+    
+    Args:
+        event: API Gateway Lambda event
+        
+    Returns:
+        None if authenticated, otherwise a 401 response
+    """
+    try:
+        # Extract token
+        token = extract_token(event)
+        if not token:
+            return dict(_MISSING_TOKEN_RESPONSE)
+        
+        # Validate token
+        claims = _VALIDATOR.validate_token(token)
+        
+        # Add claims to event for handler use
+        event['claims'] = claims
+        event['user_id'] = claims.get('cognito:username')
+        event['school_id'] = claims.get('custom:school_id')
+        event['role'] = claims.get('custom:role')
+        
+        return None
+        
+    except AuthError as e:
+        logger.error("Authentication failed: %s", e)
+        return {
+            'statusCode': 401,
+            'body': _dumps({'error': str(e)})
+        }
+
 def requires_auth(handler):
     """
     Decorator for Lambda handlers requiring authentication
@@ -156,34 +276,12 @@ def requires_auth(handler):
     """
     @wraps(handler)
     def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
-        try:
-            # Extract token
-            token = extract_token(event)
-            if not token:
-                return {
-                    'statusCode': 401,
-                    'body': json.dumps({'error': 'Missing authentication token'})
-                }
-            
-            # Validate token
-            validator = JWTValidator()
-            claims = validator.validate_token(token)
-            
-            # Add claims to event for handler use
-            event['claims'] = claims
-            event['user_id'] = claims.get('cognito:username')
-            event['school_id'] = claims.get('custom:school_id')
-            event['role'] = claims.get('custom:role')
-            
-            # Call the actual handler
-            return handler(event, context)
-            
-        except Exception as e:
-            logger.error(f"Authentication failed: {str(e)}")
-            return {
-                'statusCode': 401,
-                'body': json.dumps({'error': str(e)})
-            }
+        error = _authenticate(event)
+        if error:
+            return error
+        
+        # Call the actual handler
+        return handler(event, context)
     
     return wrapper
 
@@ -201,25 +299,22 @@ def requires_role(*allowed_roles):
         @wraps(handler)
         def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             # First validate authentication
-            auth_wrapper = requires_auth(handler)
-            result = auth_wrapper(event, context)
+            error = _authenticate(event)
+            if error:
+                return error
             
-            # If authentication failed, return the error
-            if isinstance(result, dict) and result.get('statusCode') == 401:
-                return result
-            
-            # Check role
+            # Check role before the handler runs
             user_role = event.get('role')
             if user_role not in allowed_roles:
-                logger.warning(f"Access denied for role {user_role}, required: {allowed_roles}")
+                logger.warning("Access denied for role %s, required: %s", user_role, allowed_roles)
                 return {
                     'statusCode': 403,
-                    'body': json.dumps({
+                    'body': _dumps({
                         'error': f'Insufficient permissions. Required role: {allowed_roles}'
                     })
                 }
             
-            return result
+            return handler(event, context)
         
         return wrapper
     
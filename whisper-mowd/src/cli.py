@@ -6,9 +6,14 @@ Process audio files and generate transcripts and summaries
 
 import os
 import sys
+import atexit
 import signal
+import shutil
 import argparse
 import logging
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
@@ -17,14 +22,26 @@ from dotenv import load_dotenv
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import components
-from src.transcription.whisper_service import WhisperTranscriber
+from src.transcription.whisper_service import WhisperTranscriber, resolve_device, DEFAULT_BATCH_SIZE
 from src.transcription.file_converter import AudioFileConverter
+from src.transcription.utils import load_audio
 from src.summarization.base_summarizer import NullSummarizer
 from src.summarization.openai_summarizer import OpenAISummarizer
 from src.summarization.custom_llm import CustomLLMSummarizer
 from src.storage.local_storage import LocalStorage
 from src.storage.secure_aws_storage import SecureAWSStorage as AWSStorage
 
+try:
+    import orjson
+    
+    def _dump_json(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    
+    def _dump_json(obj):
+        return json.dumps(obj, indent=2).encode('utf-8')
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,14 +52,22 @@ logger = logging.getLogger("cli")
 # Load environment variables
 load_dotenv()
 
-transcriber = None  # Global variable to hold the transcriber instance
+# Defaults from the environment, read once; they don't change after load_dotenv()
+_STORAGE_MODE = os.getenv("STORAGE_MODE", "local").lower()
+_SUMMARIZER_TYPE = os.getenv("SUMMARIZER_TYPE", "none").lower()
+_WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+
+active_transcriber = None  # Global variable to hold the running transcriber instance
+
+# Files in flight at once when the CLI is given several: one converting,
+# one transcribing, one saving
+PIPELINE_DEPTH = 3
 
 def handle_sigint(sig, frame):
     """Handle keyboard interrupt (Ctrl+C)"""
-    global transcriber
-    if transcriber:
+    if active_transcriber:
         logger.info("Cancellation requested. Please wait...")
-        transcriber.cancel_transcription()
+        active_transcriber.cancel_transcription()
     else:
         # Exit immediately if transcriber isn't initialized
         logger.info("Exiting...")
@@ -51,6 +76,39 @@ def handle_sigint(sig, frame):
 # Register the signal handler
 signal.signal(signal.SIGINT, handle_sigint)
 
+# Transcribers by (model_size, device, compute_type, batch_size), so repeated
+# process_file calls reuse weights that are already loaded
+_MODEL_CACHE = {}
+
+def get_transcriber(model_size, device="auto", compute_type="auto", batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Get a shared transcriber for a model configuration
+    
+    Args:
+        model_size: Whisper model size (tiny, base, small, medium, large)
+        device: Inference device (cpu, cuda, or auto)
+        compute_type: CTranslate2 compute type (e.g. int8, or auto)
+        batch_size: Speech chunks decoded together per forward pass
+        
+    Returns:
+        WhisperTranscriber (its model loads on first use)
+    """
+    key = (model_size, device, compute_type, batch_size)
+    transcriber = _MODEL_CACHE.get(key)
+    if transcriber is None:
+        transcriber = _MODEL_CACHE.setdefault(key, WhisperTranscriber(
+            model_size=model_size, device=device, compute_type=compute_type,
+            batch_size=batch_size
+        ))
+    return transcriber
+
+@atexit.register
+def _unload_models():
+    """Free cached models before interpreter shutdown tears down CUDA"""
+    for transcriber in _MODEL_CACHE.values():
+        transcriber.unload()
+    _MODEL_CACHE.clear()
+
 def get_storage(storage_mode=None):
     """
     Get the appropriate storage implementation
@@ -62,11 +120,10 @@ def get_storage(storage_mode=None):
         Storage instance
     """
     # Get storage mode from env if not specified
-    if storage_mode is None:
-        storage_mode = os.getenv("STORAGE_MODE", "local")
+    storage_mode = storage_mode.lower() if storage_mode else _STORAGE_MODE
     
     # Create and return the appropriate storage implementation
-    if storage_mode.lower() == "aws":
+    if storage_mode == "aws":
         return AWSStorage()
     else:
         return LocalStorage()
@@ -82,19 +139,37 @@ def get_summarizer(summarizer_type=None):
         Summarizer instance
     """
     # Get summarizer type from env if not specified
-    if summarizer_type is None:
-        summarizer_type = os.getenv("SUMMARIZER_TYPE", "none")
+    summarizer_type = summarizer_type.lower() if summarizer_type else _SUMMARIZER_TYPE
     
     # Create and return the appropriate summarizer implementation
-    if summarizer_type.lower() == "openai":
+    if summarizer_type == "openai":
         return OpenAISummarizer()
-    elif summarizer_type.lower() == "custom_llm":
+    elif summarizer_type == "custom_llm":
         return CustomLLMSummarizer()
     else:
         return NullSummarizer()
 
+def _copy_output(saved_path, output_path, text):
+    """
+    Write an output copy of text that storage has already saved
+    
+    Args:
+        saved_path: What storage returned for the saved text (a local path, an S3 URI, or None)
+        output_path: Path of the output copy
+        text: The text itself, written directly if saved_path isn't a local file
+    """
+    # copyfile copies in the kernel (sendfile) rather than re-encoding the text;
+    # a hard link would be cheaper still, but would tie the output copy to the
+    # stored file so that editing one changes the other
+    if saved_path and os.path.isfile(saved_path):
+        shutil.copyfile(saved_path, output_path)
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
 def process_file(file_path, output_dir=None, model_size=None, summarizer_type=None, 
-                storage_mode=None, lecture_id=None, convert_format="mp3"):
+                storage_mode=None, lecture_id=None, convert_format="mp3", transcriber=None,
+                audio=None, device="auto", compute_type="auto", transcribe_lock=None):
     """
     Process a single audio file
     
@@ -106,6 +181,12 @@ def process_file(file_path, output_dir=None, model_size=None, summarizer_type=No
         storage_mode: Storage mode (local or aws)
         lecture_id: Custom lecture ID (generated if None)
         convert_format: Format for audio conversion (mp3 or wav)
+        transcriber: WhisperTranscriber to use (shared per configuration if None)
+        audio: Samples already decoded with load_audio() (decoded here if None)
+        device: Inference device for a new transcriber (cpu, cuda, or auto)
+        compute_type: CTranslate2 compute type for a new transcriber (e.g. int8, or auto)
+        transcribe_lock: Lock held only while transcribing, so other files can be
+            converted and saved on other threads meanwhile (None to not lock)
         
     Returns:
         Dictionary with results
@@ -117,11 +198,15 @@ def process_file(file_path, output_dir=None, model_size=None, summarizer_type=No
     
     # Get model size from env if not specified
     if model_size is None:
-        model_size = os.getenv("WHISPER_MODEL_SIZE", "base")
+        model_size = _WHISPER_MODEL_SIZE
     
     # Create components
-    global transcriber
-    transcriber = WhisperTranscriber(model_size=model_size)
+    global active_transcriber
+    if transcriber is None:
+        transcriber = get_transcriber(model_size, device, compute_type)
+    else:
+        model_size = transcriber.model_size
+    active_transcriber = transcriber
     converter = AudioFileConverter(default_output_format=convert_format)
     summarizer = get_summarizer(summarizer_type)
     storage = get_storage(storage_mode)
@@ -146,45 +231,42 @@ def process_file(file_path, output_dir=None, model_size=None, summarizer_type=No
         else:
             audio_path = str(file_path)
         
-        # Step 2: Save original audio to storage
-        storage.save_audio(audio_path, lecture_id)
+        # Decode outside the transcribe lock, so decoding one file overlaps
+        # another file's transcription, and before saving, which may move
+        # the converted file away
+        if audio is None:
+            audio = load_audio(audio_path)
+        
+        # Step 2: Save original audio to storage; a converted temporary file
+        # is moved into local storage rather than copied
+        if temp_files and isinstance(storage, LocalStorage):
+            storage.save_audio(audio_path, lecture_id, move=True)
+        else:
+            storage.save_audio(audio_path, lecture_id)
         
         # Step 3: Transcribe audio
         logger.info(f"Transcribing audio using Whisper ({model_size})")
-        transcription = transcriber.transcribe(audio_path)
+        with transcribe_lock or contextlib.nullcontext():
+            transcription = transcriber.transcribe(audio)
         transcript_text = transcriber.get_text(transcription)
         
         # Step 4: Save transcript to storage
-        storage.save_transcript(lecture_id, transcript_text)
+        transcript_path = storage.save_transcript(lecture_id, transcript_text)
         storage.save_transcript_with_timestamps(lecture_id, transcription)
-        logger.info(f"Transcript length: {len(transcript_text)} characters")
+        logger.info(f"Saved transcript ({len(transcript_text)} characters) to {transcript_path}")
         if len(transcript_text) == 0:
             logger.error("WARNING: Empty transcript generated")
-
-        # When saving to file
-        transcript_path = storage.save_transcript(lecture_id, transcript_text)
-        logger.info(f"Saved transcript to {transcript_path}, verifying file...")
-
-        # Verify the file was saved properly
-        try:
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if len(content) == 0:
-                    logger.error(f"Verification failed - file exists but is empty: {transcript_path}")
-                else:
-                    logger.info(f"Verification successful - file contains {len(content)} characters")
-        except Exception as e:
-            logger.error(f"Error verifying transcript file: {e}")
         
         # Step 5: Generate summary if summarizer is available
         summary_text = None
+        summary_path = None
         if not isinstance(summarizer, NullSummarizer):
             logger.info(f"Generating summary using {summarizer.get_name()}")
             summary_text = summarizer.summarize(transcription)
             
             # Save summary to storage if generated
             if summary_text:
-                storage.save_summary(lecture_id, summary_text)
+                summary_path = storage.save_summary(lecture_id, summary_text)
         
         # Step 6: Save metadata
         metadata = {
@@ -206,18 +288,14 @@ def process_file(file_path, output_dir=None, model_size=None, summarizer_type=No
             output_dir.mkdir(parents=True, exist_ok=True)
             
             # Save transcript
-            with open(output_dir / f"{lecture_id}_transcript.txt", 'w', encoding='utf-8') as f:
-                f.write(transcript_text)
+            _copy_output(transcript_path, output_dir / f"{lecture_id}_transcript.txt", transcript_text)
             
             # Save summary if available
             if summary_text:
-                with open(output_dir / f"{lecture_id}_summary.txt", 'w', encoding='utf-8') as f:
-                    f.write(summary_text)
+                _copy_output(summary_path, output_dir / f"{lecture_id}_summary.txt", summary_text)
             
             # Save metadata
-            with open(output_dir / f"{lecture_id}_metadata.json", 'w', encoding='utf-8') as f:
-                import json
-                json.dump(metadata, f, indent=2)
+            (output_dir / f"{lecture_id}_metadata.json").write_bytes(_dump_json(metadata))
         
         logger.info(f"Processing complete for lecture_id: {lecture_id}")
         
@@ -240,7 +318,8 @@ def process_file(file_path, output_dir=None, model_size=None, summarizer_type=No
 def main():
     """Main function for CLI usage"""
     parser = argparse.ArgumentParser(description="Process lecture audio files with Whisper MOWD")
-    parser.add_argument("--audio", required=True, help="Path to audio or video file")
+    parser.add_argument("--audio", required=True, nargs="+",
+                        help="Path to one or more audio or video files")
     parser.add_argument("--output", default="output", help="Output directory")
     parser.add_argument("--model", default=None, choices=["tiny", "base", "small", "medium", "large"], 
                         help="Whisper model size (default: from env or 'base')")
@@ -251,46 +330,77 @@ def main():
     parser.add_argument("--format", default="mp3", choices=["mp3", "wav"], 
                         help="Format to convert files to before processing")
     parser.add_argument("--lecture-id", default=None, 
-                        help="Custom lecture ID (default: generated from timestamp and filename)")
-    parser.add_argument("--device", default="cpu", choices=["cpu", "cuda", "auto"],
-                    help="Device to use for inference (default: cpu)")
-    parser.add_argument("--compute-type", default="default", 
-                    choices=["default", "int8", "int8_float16", "int16", "float16", "float32"],
-                    help="Compute type for inference (default: default)")
+                        help="Custom lecture ID, single file only (default: generated from timestamp and filename)")
+    parser.add_argument("--device", default="auto", choices=["cpu", "cuda", "auto"],
+                    help="Device to use for inference (default: cuda if a GPU is available, else cpu)")
+    parser.add_argument("--compute-type", default="auto", 
+                    choices=["auto", "int8", "int8_float32", "int8_float16", "int16", "float16", "float32"],
+                    help="Compute type for inference (default: fastest the device supports)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                    help="Speech chunks decoded together per forward pass; 1 disables batching (default: 8)")
     
     args = parser.parse_args()
     
-    try:
-        # Process the file
-        result = process_file(
-            file_path=args.audio,
+    if args.lecture_id and len(args.audio) > 1:
+        parser.error("--lecture-id can only be used with a single --audio file")
+    
+    # Load the model once for every file on the command line, on the GPU
+    # when one is visible
+    device = resolve_device(args.device)
+    logger.info(f"Using device: {device}")
+    transcriber = get_transcriber(
+        args.model or _WHISPER_MODEL_SIZE,
+        device=device,
+        compute_type=args.compute_type,
+        batch_size=args.batch_size
+    )
+    
+    # Files run as a pipeline: while one file holds the model, the next is
+    # converted and the previous one is saved and summarized
+    transcribe_lock = threading.Lock()
+    
+    def run(audio_path):
+        return process_file(
+            file_path=audio_path,
             output_dir=args.output,
             model_size=args.model,
             summarizer_type=args.summarizer,
             storage_mode=args.storage,
             lecture_id=args.lecture_id,
-            convert_format=args.format
+            convert_format=args.format,
+            transcriber=transcriber,
+            device=device,
+            compute_type=args.compute_type,
+            transcribe_lock=transcribe_lock
         )
+    
+    failures = 0
+    with ThreadPoolExecutor(max_workers=min(PIPELINE_DEPTH, len(args.audio))) as executor:
+        futures = [(audio_path, executor.submit(run, audio_path)) for audio_path in args.audio]
         
-        # Print success message
-        print(f"\nProcessing completed successfully!")
-        print(f"Lecture ID: {result['lecture_id']}")
-        print(f"Output directory: {os.path.abspath(args.output)}")
-        
-        # Print summary info if available
-        if result['summary']:
-            print(f"Transcript length: {len(result['transcript'])} characters")
-            print(f"Summary length: {len(result['summary'])} characters")
-        else:
-            print(f"Transcript length: {len(result['transcript'])} characters")
-            print("No summary generated")
-        
-    except Exception as e:
-        logger.error(f"Error processing file: {e}")
-        print(f"Error: {e}")
-        return 1
-        
-    return 0
+        for audio_path, future in futures:
+            try:
+                result = future.result()
+                
+                # Print success message
+                print(f"\nProcessing completed successfully!")
+                print(f"Lecture ID: {result['lecture_id']}")
+                print(f"Output directory: {os.path.abspath(args.output)}")
+                
+                # Print summary info if available
+                if result['summary']:
+                    print(f"Transcript length: {len(result['transcript'])} characters")
+                    print(f"Summary length: {len(result['summary'])} characters")
+                else:
+                    print(f"Transcript length: {len(result['transcript'])} characters")
+                    print("No summary generated")
+                
+            except Exception as e:
+                logger.error(f"Error processing file {audio_path}: {e}")
+                print(f"Error: {e}")
+                failures += 1
+    
+    return 1 if failures else 0
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -6,18 +6,38 @@ Handles right to erasure requests under GDPR Article 17
 import json
 import logging
 import boto3
+from botocore.config import Config
 from datetime import datetime
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple
 import os
 
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _dumps = json.dumps
+
 # Setup logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-s3 = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
-cloudtrail = boto3.client('cloudtrail')
+# Concurrent S3/DynamoDB requests while deleting a user's data
+DELETE_WORKERS = 32
+
+# Initialize AWS clients; the connection pool is sized for DELETE_WORKERS
+# so concurrent deletes don't queue for a connection, and adaptive retries
+# back off when S3 throttles a large deletion
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+    max_pool_connections=DELETE_WORKERS
+)
+s3 = boto3.client('s3', config=BOTO_CONFIG)
+dynamodb = boto3.resource('dynamodb', config=BOTO_CONFIG)
+cloudtrail = boto3.client('cloudtrail', config=BOTO_CONFIG)
 
 # Environment variables
 AUDIO_BUCKET = os.environ['AUDIO_BUCKET']
@@ -26,6 +46,16 @@ SUMMARY_BUCKET = os.environ['SUMMARY_BUCKET']
 METADATA_TABLE = os.environ['METADATA_TABLE']
 AUDIT_TABLE = os.environ['AUDIT_TABLE']
 
+# Table handles are bound once per container and reused across invocations
+_meta_table = dynamodb.Table(METADATA_TABLE)
+_audit_table = dynamodb.Table(AUDIT_TABLE)
+
+# Most keys S3 accepts in one DeleteObjects request
+S3_DELETE_BATCH_SIZE = 1000
+
+# Audit records are kept for a year
+AUDIT_RETENTION_SECONDS = 365 * 24 * 60 * 60
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Main Lambda handler for GDPR deletion requests
@@ -49,7 +79,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not user_id or not request_id:
             return {
                 'statusCode': 400,
-                'body': json.dumps({
+                'body': _dumps({
                     'error': 'Missing required fields: user_id and request_id'
                 })
             }
@@ -71,7 +101,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': _dumps({
                 'request_id': request_id,
                 'status': 'completed',
                 'deleted_items': deletion_results['summary'],
@@ -83,7 +113,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         logger.error(f"Error processing deletion request: {str(e)}")
         return {
             'statusCode': 500,
-            'body': json.dumps({
+            'body': _dumps({
                 'error': 'Internal server error processing deletion request'
             })
         }
@@ -107,31 +137,27 @@ def find_user_data(user_id: str, school_id: str = None) -> Dict[str, List[str]]:
     }
     
     try:
-        # Query DynamoDB for user's lectures
-        table = dynamodb.Table(METADATA_TABLE)
-        
-        # Use GSI if school_id provided
+        # Query the user's own index, a page at a time; school_id only
+        # narrows the results
+        query_args = {
+            'IndexName': 'UserIndex',
+            'KeyConditionExpression': 'user_id = :uid',
+            'ExpressionAttributeValues': {':uid': user_id}
+        }
         if school_id:
-            response = table.query(
-                IndexName='SchoolIndex',
-                KeyConditionExpression='school_id = :sid',
-                FilterExpression='user_id = :uid',
-                ExpressionAttributeValues={
-                    ':sid': school_id,
-                    ':uid': user_id
-                }
-            )
-        else:
-            # Scan for user_id (less efficient)
-            response = table.scan(
-                FilterExpression='user_id = :uid',
-                ExpressionAttributeValues={
-                    ':uid': user_id
-                }
-            )
+            query_args['FilterExpression'] = 'school_id = :sid'
+            query_args['ExpressionAttributeValues'][':sid'] = school_id
+        
+        items = []
+        while True:
+            response = _meta_table.query(**query_args)
+            items.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
         
         # Process items
-        for item in response.get('Items', []):
+        for item in items:
             lecture_id = item['lecture_id']
             
             # Build S3 keys
@@ -159,120 +185,165 @@ def delete_user_data(user_data: Dict[str, List[str]]) -> Dict[str, Any]:
     Returns:
         Deletion results summary
     """
-    results = {
-        'audio_deleted': 0,
-        'transcripts_deleted': 0,
-        'summaries_deleted': 0,
-        'metadata_deleted': 0,
-        'errors': [],
-        'summary': {}
-    }
+    errors = []
+    
+    s3_sources = [
+        (AUDIO_BUCKET, 'audio_files'),
+        (TRANSCRIPT_BUCKET, 'transcripts'),
+        (SUMMARY_BUCKET, 'summaries')
+    ]
     
-    # Delete S3 objects
-    for bucket, prefix, data_type in [
-        (AUDIO_BUCKET, 'audio_files', 'audio'),
-        (TRANSCRIPT_BUCKET, 'transcripts', 'transcripts'),
-        (SUMMARY_BUCKET, 'summaries', 'summaries')
-    ]:
-        for key_pattern in user_data[prefix]:
+    # S3 calls are latency-bound, so the buckets, the table and the individual
+    # listings and delete batches all run side by side
+    with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+        metadata_future = executor.submit(delete_metadata_items, user_data['metadata_items'])
+        
+        # List every version of every matching object
+        listings = [
+            (bucket, key_pattern, executor.submit(list_object_versions, bucket, key_pattern))
+            for bucket, prefix in s3_sources
+            for key_pattern in user_data[prefix]
+        ]
+        objects = {bucket: [] for bucket, _ in s3_sources}
+        keys = {bucket: set() for bucket, _ in s3_sources}
+        for bucket, key_pattern, future in listings:
+            try:
+                versions, delete_markers = future.result()
+                objects[bucket].extend(versions)
+                objects[bucket].extend(delete_markers)
+                keys[bucket].update(version['Key'] for version in versions)
+            except Exception as e:
+                error_msg = f"Error listing {key_pattern} in {bucket}: {str(e)}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+        
+        # Delete them, one DeleteObjects batch per task
+        batches = [
+            (bucket, objects[bucket][start:start + S3_DELETE_BATCH_SIZE])
+            for bucket, _ in s3_sources
+            for start in range(0, len(objects[bucket]), S3_DELETE_BATCH_SIZE)
+        ]
+        deletions = [
+            (bucket, batch, executor.submit(delete_s3_objects, bucket, batch))
+            for bucket, batch in batches
+        ]
+        failed_keys = {bucket: set() for bucket, _ in s3_sources}
+        for bucket, batch, future in deletions:
             try:
-                # List objects matching pattern
-                if key_pattern.endswith('.*'):
-                    # Handle wildcard for audio files
-                    prefix_key = key_pattern[:-2]
-                    response = s3.list_objects_v2(
-                        Bucket=bucket,
-                        Prefix=prefix_key
-                    )
-                    
-                    for obj in response.get('Contents', []):
-                        delete_s3_object(bucket, obj['Key'])
-                        results[f'{data_type}_deleted'] += 1
-                else:
-                    # Direct key deletion
-                    if check_s3_object_exists(bucket, key_pattern):
-                        delete_s3_object(bucket, key_pattern)
-                        results[f'{data_type}_deleted'] += 1
-                        
+                for error in future.result():
+                    error_msg = f"Error deleting {error['Key']} from {bucket}: {error.get('Message', error.get('Code'))}"
+                    logger.error(error_msg)
+                    errors.append(error_msg)
+                    failed_keys[bucket].add(error['Key'])
             except Exception as e:
-                error_msg = f"Error deleting {key_pattern} from {bucket}: {str(e)}"
+                error_msg = f"Error deleting objects from {bucket}: {str(e)}"
                 logger.error(error_msg)
-                results['errors'].append(error_msg)
+                errors.append(error_msg)
+                # Only this batch's keys are in doubt; the others succeeded
+                failed_keys[bucket].update(obj['Key'] for obj in batch)
+        
+        deleted = {}
+        for bucket, _ in s3_sources:
+            deleted[bucket] = len(keys[bucket] - failed_keys[bucket])
+            logger.info(f"Deleted {deleted[bucket]} objects ({len(objects[bucket])} versions) from {bucket}")
+        
+        # Collect DynamoDB results
+        metadata_deleted, metadata_errors = metadata_future.result()
+        errors.extend(metadata_errors)
     
-    # Delete DynamoDB items
-    table = dynamodb.Table(METADATA_TABLE)
-    for lecture_id in user_data['metadata_items']:
-        try:
-            table.delete_item(
-                Key={'lecture_id': lecture_id}
-            )
-            results['metadata_deleted'] += 1
-        except Exception as e:
-            error_msg = f"Error deleting metadata for {lecture_id}: {str(e)}"
-            logger.error(error_msg)
-            results['errors'].append(error_msg)
+    audio_deleted = deleted[AUDIO_BUCKET]
+    transcripts_deleted = deleted[TRANSCRIPT_BUCKET]
+    summaries_deleted = deleted[SUMMARY_BUCKET]
     
-    # Create summary
-    results['summary'] = {
-        'total_audio_files': results['audio_deleted'],
-        'total_transcripts': results['transcripts_deleted'],
-        'total_summaries': results['summaries_deleted'],
-        'total_metadata': results['metadata_deleted'],
-        'total_errors': len(results['errors'])
+    return {
+        'audio_deleted': audio_deleted,
+        'transcripts_deleted': transcripts_deleted,
+        'summaries_deleted': summaries_deleted,
+        'metadata_deleted': metadata_deleted,
+        'errors': errors,
+        'summary': {
+            'total_audio_files': audio_deleted,
+            'total_transcripts': transcripts_deleted,
+            'total_summaries': summaries_deleted,
+            'total_metadata': metadata_deleted,
+            'total_errors': len(errors)
+        }
     }
-    
-    return results
 
-def delete_s3_object(bucket: str, key: str) -> None:
+def list_object_versions(bucket: str, key_pattern: str) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
     """
-    Delete a single S3 object with versioning support
+    List every version of the objects matching a key pattern
     
     Args:
         bucket: S3 bucket name
-        key: Object key
+        key_pattern: Exact object key, or a key ending in '.*' to match any extension
+        
+    Returns:
+        Tuple of (versions, delete markers), each as {'Key', 'VersionId'} dicts
+        ready for delete_objects
     """
-    try:
-        # Delete the object
-        s3.delete_object(Bucket=bucket, Key=key)
+    if key_pattern.endswith('.*'):
+        # Keep the dot so lecture 'abc' doesn't also match lecture 'abcd'
+        prefix, exact = key_pattern[:-1], False
+    else:
+        prefix, exact = key_pattern, True
+    
+    versions = []
+    delete_markers = []
+    paginator = s3.get_paginator('list_object_versions')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for found, entries in ((versions, page.get('Versions', [])),
+                               (delete_markers, page.get('DeleteMarkers', []))):
+            for entry in entries:
+                if exact and entry['Key'] != key_pattern:
+                    continue
+                found.append({'Key': entry['Key'], 'VersionId': entry['VersionId']})
+    
+    return versions, delete_markers
+
+def delete_s3_objects(bucket: str, objects: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Permanently delete object versions, up to 1000 per request
+    
+    Args:
+        bucket: S3 bucket name
+        objects: {'Key', 'VersionId'} dicts from list_object_versions
         
-        # Also delete all versions if versioning is enabled
-        versions = s3.list_object_versions(
+    Returns:
+        Errors reported by S3 for objects that could not be deleted
+    """
+    errors = []
+    for start in range(0, len(objects), S3_DELETE_BATCH_SIZE):
+        response = s3.delete_objects(
             Bucket=bucket,
-            Prefix=key
+            Delete={
+                'Objects': objects[start:start + S3_DELETE_BATCH_SIZE],
+                'Quiet': True  # Only report failures
+            }
         )
-        
-        for version in versions.get('Versions', []):
-            s3.delete_object(
-                Bucket=bucket,
-                Key=key,
-                VersionId=version['VersionId']
-            )
-            
-        logger.info(f"Deleted {key} from {bucket}")
-        
-    except Exception as e:
-        logger.error(f"Error deleting {key} from {bucket}: {str(e)}")
-        raise
+        errors.extend(response.get('Errors', []))
+    return errors
 
-def check_s3_object_exists(bucket: str, key: str) -> bool:
+def delete_metadata_items(lecture_ids: List[str]) -> Tuple[int, List[str]]:
     """
-    Check if an S3 object exists
+    Delete lecture metadata items, 25 per BatchWriteItem request
     
     Args:
-        bucket: S3 bucket name
-        key: Object key
+        lecture_ids: Lecture identifiers to delete
         
     Returns:
-        True if object exists
+        Tuple of (number of items deleted, error messages)
     """
     try:
-        s3.head_object(Bucket=bucket, Key=key)
-        return True
-    except s3.exceptions.NoSuchKey:
-        return False
+        # batch_writer groups the deletes and resends unprocessed items
+        with _meta_table.batch_writer() as batch:
+            for lecture_id in lecture_ids:
+                batch.delete_item(Key={'lecture_id': lecture_id})
+        return len(lecture_ids), []
     except Exception as e:
-        logger.error(f"Error checking object {key} in {bucket}: {str(e)}")
-        return False
+        error_msg = f"Error deleting metadata for {len(lecture_ids)} lectures: {str(e)}"
+        logger.error(error_msg)
+        return 0, [error_msg]
 
 def create_audit_log(user_id: str, school_id: str, request_id: str, reason: str) -> Dict[str, str]:
     """
@@ -287,7 +358,9 @@ def create_audit_log(user_id: str, school_id: str, request_id: str, reason: str)
     Returns:
         Audit entry details
     """
-    audit_id = f"GDPR-{request_id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+    # One clock read, so the ID, request time and TTL all agree
+    now = datetime.utcnow()
+    audit_id = f"GDPR-{request_id}-{now.strftime('%Y%m%d%H%M%S')}"
     
     audit_entry = {
         'audit_id': audit_id,
@@ -295,14 +368,13 @@ def create_audit_log(user_id: str, school_id: str, request_id: str, reason: str)
         'user_id': user_id,
         'school_id': school_id,
         'reason': reason,
-        'request_time': datetime.utcnow().isoformat(),
+        'request_time': now.isoformat(),
         'status': 'in_progress',
-        'ttl': int((datetime.utcnow().timestamp())) + (365 * 24 * 60 * 60)  # 1 year retention
+        'ttl': int(now.timestamp()) + AUDIT_RETENTION_SECONDS
     }
     
     try:
-        table = dynamodb.Table(AUDIT_TABLE)
-        table.put_item(Item=audit_entry)
+        _audit_table.put_item(Item=audit_entry)
         logger.info(f"Created audit log: {audit_id}")
     except Exception as e:
         logger.error(f"Error creating audit log: {str(e)}")
@@ -319,8 +391,7 @@ def update_audit_log(audit_id: str, results: Dict[str, Any]) -> None:
         results: Deletion results
     """
     try:
-        table = dynamodb.Table(AUDIT_TABLE)
-        table.update_item(
+        _audit_table.update_item(
             Key={'audit_id': audit_id},
             UpdateExpression='SET #status = :status, completion_time = :time, results = :results',
             ExpressionAttributeNames={
@@ -347,7 +418,7 @@ def send_deletion_confirmation(user_id: str, request_id: str, results: Dict[str,
     """
     # In production, this would send an email or notification
     logger.info(f"Deletion completed for user {user_id}, request {request_id}")
-    logger.info(f"Results: {json.dumps(results['summary'])}")
+    logger.info(f"Results: {_dumps(results['summary'])}")
     
     # Log to CloudTrail for compliance
     try:
@@ -363,7 +434,7 @@ def send_deletion_confirmation(user_id: str, request_id: str, results: Dict[str,
                             'ResourceName': user_id
                         }
                     ],
-                    'CloudTrailEvent': json.dumps({
+                    'CloudTrailEvent': _dumps({
                         'requestId': request_id,
                         'results': results['summary']
                     })
@@ -4,13 +4,88 @@ Provides consistent logging format for security and compliance
 """
 
 import json
+import time
+import queue
+import collections
+import atexit
 import logging
+import logging.handlers
 import traceback
-from datetime import datetime
 from typing import Any, Dict, Optional
 import os
 import sys
 
+try:
+    import orjson
+    
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _dumps = json.dumps
+
+# Records waiting to be written; when the writer falls this far behind, the
+# oldest are dropped rather than blocking the code that is logging
+LOG_QUEUE_SIZE = 10000
+
+# Logging levels by the lowercase names StructuredLogger.log accepts
+_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL
+}
+
+# Last second formatted by _iso_timestamp, with its formatted date and time
+_timestamp_cache = (None, '')
+
+def _iso_timestamp(timestamp: float) -> str:
+    """
+    Format a Unix timestamp as an ISO 8601 UTC string with microseconds
+    
+    Args:
+        timestamp: Seconds since the epoch, e.g. time.time() or record.created
+        
+    Returns:
+        Timestamp string ending in 'Z'
+    """
+    global _timestamp_cache
+    second = int(timestamp)
+    cached_second, prefix = _timestamp_cache
+    # Records arrive many to a second, so the date and time are only
+    # formatted when the second changes
+    if second != cached_second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((timestamp - second) * 1e6):06d}Z"
+
+class _DropOldestQueueHandler(logging.handlers.QueueHandler):
+    """Queues records for a QueueListener, dropping the oldest when full"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Merge the message arguments now, while they hold their values at log
+        time; unlike the default, exception info is kept for the formatter
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord):
+        """Add a record to the queue without blocking"""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Make room by dropping the oldest record; if another thread
+            # takes the freed slot or the writer empties the queue first,
+            # this record is dropped instead
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.queue.put_nowait(record)
+            except (queue.Full, queue.Empty):
+                pass
+
 class StructuredLogger:
     """
     Creates structured JSON logs for CloudWatch with security context
@@ -32,18 +107,57 @@ class StructuredLogger:
         self.logger = logging.getLogger()
         self.logger.setLevel(getattr(logging, log_level.upper()))
         
+        # Debug records below the log level are kept, up to LOG_BUFFER_SIZE
+        # of the most recent, so they can be written out if an error follows
+        buffer_size = int(os.environ.get('LOG_BUFFER_SIZE', '256'))
+        self._buffer = collections.deque(maxlen=buffer_size) if buffer_size > 0 else None
+        
+        # Logging methods by level name, looked up once
+        self._level_funcs = {
+            'debug': self.logger.debug,
+            'info': self.logger.info,
+            'warning': self.logger.warning,
+            'error': self.logger.error,
+            'critical': self.logger.critical
+        }
+        
         # Remove default handlers
-        for handler in self.logger.handlers:
+        for handler in self.logger.handlers[:]:
             self.logger.removeHandler(handler)
         
-        # Add structured JSON handler
-        handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(self.StructuredFormatter(
+        # Add structured JSON handler. Records are formatted and written to
+        # stdout by a background thread, so callers only pay for queueing
+        self._handler = logging.StreamHandler(sys.stdout)
+        self._handler.setFormatter(self.StructuredFormatter(
             service_name=self.service_name,
             environment=self.environment,
             region=self.region
         ))
-        self.logger.addHandler(handler)
+        self._start_queue()
+        atexit.register(self._stop_queue)
+        
+        # A forked worker doesn't inherit the writer thread, so it gets its own
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._start_queue)
+    
+    def _start_queue(self):
+        """Route the root logger through a new queue and writer thread"""
+        for handler in self.logger.handlers[:]:
+            if isinstance(handler, _DropOldestQueueHandler):
+                self.logger.removeHandler(handler)
+        
+        self._queue = queue.Queue(LOG_QUEUE_SIZE)
+        self._listener = logging.handlers.QueueListener(self._queue, self._handler)
+        self._listener.start()
+        self.logger.addHandler(_DropOldestQueueHandler(self._queue))
+    
+    def _stop_queue(self):
+        """Write out the remaining records and stop the writer thread"""
+        self._listener.stop()
+    
+    def flush(self):
+        """Wait until every queued record has been written"""
+        self._queue.join()
     
     class StructuredFormatter(logging.Formatter):
         """Custom formatter for structured JSON output"""
@@ -53,6 +167,15 @@ class StructuredLogger:
             self.service_name = service_name
             self.environment = environment
             self.region = region
+            
+            # Fields that are the same on every record are encoded once, as
+            # the opening of the JSON object each record is appended to
+            self._static_fields = {
+                'service': service_name,
+                'environment': environment,
+                'region': region
+            }
+            self._static_prefix = _dumps(self._static_fields)[:-1] + ','
         
         def format(self, record: logging.LogRecord) -> str:
             """
@@ -64,13 +187,11 @@ class StructuredLogger:
             Returns:
                 JSON formatted log string
             """
-            # Base log structure
+            # Base log structure; service, environment and region come from
+            # the static prefix
             log_data = {
-                '@timestamp': datetime.utcnow().isoformat() + 'Z',
+                '@timestamp': _iso_timestamp(record.created),
                 'level': record.levelname,
-                'service': self.service_name,
-                'environment': self.environment,
-                'region': self.region,
                 'message': record.getMessage(),
                 'logger': record.name,
                 'thread': record.thread,
@@ -86,8 +207,9 @@ class StructuredLogger:
                 }
             
             # Add custom attributes
-            if hasattr(record, 'custom_attrs'):
-                log_data.update(record.custom_attrs)
+            custom_attrs = getattr(record, 'custom_attrs', None)
+            if custom_attrs:
+                log_data.update(custom_attrs)
             
             # Add security context if present
             if hasattr(record, 'security_context'):
@@ -97,7 +219,12 @@ class StructuredLogger:
             if hasattr(record, 'request_context'):
                 log_data['request'] = record.request_context
             
-            return json.dumps(log_data)
+            # Custom attributes that override a static field need the
+            # object built in full
+            if custom_attrs and not self._static_fields.keys().isdisjoint(custom_attrs):
+                return _dumps({**self._static_fields, **log_data})
+            
+            return self._static_prefix + _dumps(log_data)[1:]
     
     def log(self, level: str, message: str, **kwargs):
         """
@@ -108,6 +235,35 @@ class StructuredLogger:
             message: Log message
             **kwargs: Additional structured data
         """
+        self._emit(level.lower(), message, kwargs)
+    
+    def _emit(self, level: str, message: str, kwargs: Dict[str, Any]):
+        """
+        Log a message at a lowercase level name
+        
+        Args:
+            level: Lowercase log level
+            message: Log message
+            kwargs: Additional structured data
+        """
+        # Filtered-out messages return before any record is built
+        if not self.logger.isEnabledFor(_LEVELS[level]):
+            if level == 'debug' and self._buffer is not None:
+                self._buffer.append((time.time(), message, kwargs))
+            return
+        
+        self._level_funcs[level](message, extra=self._extra(kwargs))
+    
+    def _extra(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Split structured data into the record attributes the formatter reads
+        
+        Args:
+            kwargs: Additional structured data
+            
+        Returns:
+            Dictionary to pass as a log call's extra argument
+        """
         extra = {
             'custom_attrs': kwargs
         }
@@ -119,27 +275,53 @@ class StructuredLogger:
         if 'request_context' in kwargs:
             extra['request_context'] = kwargs.pop('request_context')
         
-        getattr(self.logger, level.lower())(message, extra=extra)
+        return extra
+    
+    def clear_buffer(self):
+        """Discard buffered debug records, e.g. once an invocation has succeeded"""
+        if self._buffer is not None:
+            self._buffer.clear()
+    
+    def flush_buffer(self):
+        """
+        Write out buffered debug records, oldest first, whatever the log level
+        """
+        if self._buffer is None:
+            return
+        
+        while True:
+            try:
+                created, message, kwargs = self._buffer.popleft()
+            except IndexError:
+                break
+            
+            record = self.logger.makeRecord(
+                self.logger.name, logging.DEBUG, '(buffered)', 0, message, None, None,
+                extra=self._extra(kwargs)
+            )
+            record.created = created
+            record.msecs = (created - int(created)) * 1000
+            self.logger.handle(record)
     
     def debug(self, message: str, **kwargs):
         """Log debug message"""
-        self.log('debug', message, **kwargs)
+        self._emit('debug', message, kwargs)
     
     def info(self, message: str, **kwargs):
         """Log info message"""
-        self.log('info', message, **kwargs)
+        self._emit('info', message, kwargs)
     
     def warning(self, message: str, **kwargs):
         """Log warning message"""
-        self.log('warning', message, **kwargs)
+        self._emit('warning', message, kwargs)
     
     def error(self, message: str, **kwargs):
         """Log error message"""
-        self.log('error', message, **kwargs)
+        self._emit('error', message, kwargs)
     
     def critical(self, message: str, **kwargs):
         """Log critical message"""
-        self.log('critical', message, **kwargs)
+        self._emit('critical', message, kwargs)
     
     def security_event(self, event_type: str, details: Dict[str, Any], 
                       severity: str = "INFO", user_id: Optional[str] = None):
@@ -155,12 +337,12 @@ class StructuredLogger:
         security_context = {
             'event_type': event_type,
             'user_id': user_id,
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'timestamp': _iso_timestamp(time.time()),
             'details': details
         }
         
-        self.log(severity.lower(), f"Security Event: {event_type}", 
-                security_context=security_context)
+        self._emit(severity.lower(), f"Security Event: {event_type}",
+                   {'security_context': security_context})
     
     def audit_trail(self, action: str, resource: str, user_id: str, 
                    result: str, details: Optional[Dict[str, Any]] = None):
@@ -179,7 +361,7 @@ class StructuredLogger:
             'audit_resource': resource,
             'audit_user': user_id,
             'audit_result': result,
-            'audit_timestamp': datetime.utcnow().isoformat() + 'Z'
+            'audit_timestamp': _iso_timestamp(time.time())
         }
         
         if details:
@@ -236,7 +418,7 @@ class StructuredLogger:
         perf_data.update(kwargs)
         
         level = 'info' if success else 'warning'
-        self.log(level, f"Performance: {operation} took {duration_ms}ms", **perf_data)
+        self._emit(level, f"Performance: {operation} took {duration_ms}ms", perf_data)
 
 # Singleton instance
 _logger_instance = None
@@ -265,19 +447,25 @@ def log_execution(func):
     """Decorator to log function execution with timing"""
     def wrapper(*args, **kwargs):
         logger = get_logger()
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         
         try:
             logger.debug(f"Starting {func.__name__}", function=func.__name__)
             result = func(*args, **kwargs)
             
-            duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+            duration = (time.perf_counter() - start_time) * 1000
             logger.log_performance(func.__name__, duration, success=True)
             
+            # A later failure in a warm container shouldn't replay this
+            # call's debug records
+            logger.clear_buffer()
+            
             return result
             
         except Exception as e:
-            duration = (datetime.utcnow() - start_time).total_seconds() * 1000
+            duration = (time.perf_counter() - start_time) * 1000
+            # Write out the debug records leading up to the failure
+            logger.flush_buffer()
             logger.log_performance(func.__name__, duration, success=False, 
                                  error=str(e))
             logger.error(f"Error in {func.__name__}: {str(e)}", 
@@ -286,12 +474,28 @@ def log_execution(func):
     
     return wrapper
 
+def flush_logs(func):
+    """Decorator for a Lambda handler that writes out queued records before returning"""
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # The execution environment can be frozen as soon as the handler
+            # returns, with records still waiting in the queue
+            get_logger().flush()
+    
+    return wrapper
+
 # Example usage:
 """
-from logging.structured_logger import get_logger, log_execution
+from logging.structured_logger import get_logger, log_execution, flush_logs
 
 logger = get_logger()
 
+@flush_logs
+def lambda_handler(event, context):
+    return process_audio(event['file_path'])
+
 @log_execution
 def process_audio(file_path):
     logger.info("Processing audio file", file_path=file_path, file_size=1024)
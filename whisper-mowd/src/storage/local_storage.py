@@ -48,13 +48,15 @@ class LocalStorage:
                           self.summary_dir, self.metadata_dir]:
             directory.mkdir(parents=True, exist_ok=True)
     
-    def save_audio(self, file_path, lecture_id=None):
+    def save_audio(self, file_path, lecture_id=None, move=False):
         """
         Save an audio file to storage
         
         Args:
             file_path: Path to the audio file
             lecture_id: Optional ID for the lecture (generated if None)
+            move: Move the file into storage instead of copying it, for
+                temporary files the caller no longer needs
             
         Returns:
             lecture_id
@@ -69,8 +71,18 @@ class LocalStorage:
         # Get the destination path
         dest_path = self.audio_dir / f"{lecture_id}{file_path.suffix}"
         
-        # Copy the file
         try:
+            if move:
+                # A rename costs nothing on the same filesystem; across
+                # filesystems fall back to copying
+                try:
+                    os.replace(file_path, dest_path)
+                    logger.info(f"Moved audio file to {dest_path}")
+                    return lecture_id
+                except OSError:
+                    pass
+            
+            # Copy the file
             shutil.copy2(file_path, dest_path)
             logger.info(f"Saved audio file to {dest_path}")
             return lecture_id
@@ -117,14 +129,12 @@ class LocalStorage:
                 f.flush()  # Ensure data is written to disk
                 os.fsync(f.fileno())  # Force OS to flush file buffers
             
+            # The write count already tells us whether anything reached the
+            # file, so there's no need to stat it again to verify
             logger.info(f"Saved transcript to {transcript_path} ({bytes_written} bytes written)")
+            if bytes_written == 0:
+                logger.error(f"Transcript file is empty: {transcript_path}")
             
-            # Verify file was written correctly
-            if os.path.exists(transcript_path) and os.path.getsize(transcript_path) > 0:
-                logger.info(f"Verified file has {os.path.getsize(transcript_path)} bytes")
-            else:
-                logger.error(f"File verification failed - file may be empty: {transcript_path}")
-                
             return transcript_path
         except Exception as e:
             logger.error(f"Failed to save transcript: {e}")
@@ -300,10 +310,10 @@ class LocalStorage:
         try:
             with open(transcript_path, 'w', encoding='utf-8') as f:
                 segments = transcription_result.get("segments", [])
-                for segment in segments:
-                    start_time = format_timestamp(segment["start"])
-                    end_time = format_timestamp(segment["end"])
-                    f.write(f"[{start_time} --> {end_time}] {segment['text']}\n")
+                f.writelines(
+                    f"[{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}] {segment['text']}\n"
+                    for segment in segments
+                )
             
             logger.info(f"Saved timestamped transcript to {transcript_path}")
             return transcript_path
@@ -10,8 +10,11 @@ import tempfile
 import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from boto3.dynamodb.conditions import Key
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from botocore.config import Config
 
@@ -20,6 +23,12 @@ from ..logging.structured_logger import get_logger
 # Initialize structured logger
 logger = get_logger("secure-aws-storage")
 
+# Extensions an uploaded lecture may have, in order of preference
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.mp4')
+
+# Partition key every metadata item carries in the DateIndex GSI
+LECTURE_PARTITION = 'LECTURE'
+
 class SecureAWSStorage:
     """
     Secure AWS storage with KMS encryption and audit logging
@@ -54,14 +63,25 @@ class SecureAWSStorage:
                    self.metadata_table_name]):
             raise ValueError("Missing required AWS configuration")
         
-        # Configure boto3 with security best practices
+        # Large audio uploads are sent as 8 MB parts, several at a time
+        transfer_concurrency = max(4, os.cpu_count() or 1)
+        self._transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=transfer_concurrency,
+            use_threads=True
+        )
+        
+        # Configure boto3 with security best practices; the connection pool
+        # has room for every concurrent part upload
         config = Config(
             region_name=self.region,
             signature_version='v4',
             retries={
                 'max_attempts': 10,
                 'mode': 'adaptive'
-            }
+            },
+            max_pool_connections=max(10, transfer_concurrency)
         )
         
         # Initialize AWS clients
@@ -105,23 +125,26 @@ class SecureAWSStorage:
             # Get KMS key ID
             kms_key_id = self._get_kms_key_id(self.kms_audio_alias)
             
-            # Upload to S3 with KMS encryption
-            with open(file_path, 'rb') as f:
-                self.s3_client.put_object(
-                    Bucket=self.audio_bucket,
-                    Key=s3_key,
-                    Body=f,
-                    ServerSideEncryption='aws:kms',
-                    SSEKMSKeyId=kms_key_id,
-                    ContentType=self._get_content_type(file_path.suffix),
-                    Metadata={
+            # Upload to S3 with KMS encryption, as a multipart upload with
+            # parts sent concurrently once the file is large enough
+            self.s3_client.upload_file(
+                str(file_path),
+                self.audio_bucket,
+                s3_key,
+                ExtraArgs={
+                    'ServerSideEncryption': 'aws:kms',
+                    'SSEKMSKeyId': kms_key_id,
+                    'ContentType': self._get_content_type(file_path.suffix),
+                    'Metadata': {
                         'lecture_id': lecture_id,
                         'upload_time': datetime.utcnow().isoformat(),
                         'file_hash': file_hash,
                         'original_filename': file_path.name
                     },
-                    StorageClass='STANDARD_IA'  # Cost optimization
-                )
+                    'StorageClass': 'STANDARD_IA'  # Cost optimization
+                },
+                Config=self._transfer_config
+            )
             
             # Log successful upload
             logger.info("Audio file uploaded successfully",
@@ -160,13 +183,20 @@ class SecureAWSStorage:
         Returns:
             Presigned URL or None if file not found
         """
-        # Try common audio extensions
-        for ext in ['.mp3', '.wav', '.m4a', '.mp4']:
-            s3_key = f"lectures/{lecture_id}{ext}"
-            
+        # Check every extension at once, so a missing .mp3 doesn't cost a
+        # round trip before the .wav is tried; results are still taken in
+        # order of preference
+        keys = [f"lectures/{lecture_id}{ext}" for ext in AUDIO_EXTENSIONS]
+        with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+            heads = [
+                executor.submit(self.s3_client.head_object, Bucket=self.audio_bucket, Key=s3_key)
+                for s3_key in keys
+            ]
+        
+        for s3_key, head in zip(keys, heads):
             try:
                 # Check if file exists
-                self.s3_client.head_object(Bucket=self.audio_bucket, Key=s3_key)
+                head.result()
                 
                 # Generate presigned URL
                 url = self.s3_client.generate_presigned_url(
@@ -215,20 +245,22 @@ class SecureAWSStorage:
             # Get KMS key ID
             kms_key_id = self._get_kms_key_id(self.kms_transcript_alias)
             
-            # Calculate content hash
-            content_hash = hashlib.sha256(transcript_text.encode()).hexdigest()
+            # Encode once for both the hash and the upload
+            body = transcript_text.encode('utf-8')
+            content_hash = hashlib.sha256(body).hexdigest()
+            word_count = len(transcript_text.split())
             
             self.s3_client.put_object(
                 Bucket=self.transcript_bucket,
                 Key=s3_key,
-                Body=transcript_text.encode('utf-8'),
+                Body=body,
                 ServerSideEncryption='aws:kms',
                 SSEKMSKeyId=kms_key_id,
                 ContentType='text/plain; charset=utf-8',
                 Metadata={
                     'lecture_id': lecture_id,
                     'content_hash': content_hash,
-                    'word_count': str(len(transcript_text.split()))
+                    'word_count': str(word_count)
                 }
             )
             
@@ -237,7 +269,7 @@ class SecureAWSStorage:
             logger.info("Transcript saved successfully",
                        lecture_id=lecture_id,
                        s3_uri=s3_uri,
-                       word_count=len(transcript_text.split()))
+                       word_count=word_count)
             
             # Audit trail
             if user_context:
@@ -256,6 +288,123 @@ class SecureAWSStorage:
                         lecture_id=lecture_id)
             raise
     
+    def save_summary(self, lecture_id: str, summary_text: Optional[str],
+                    user_context: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Save a summary to S3 with KMS encryption
+        
+        Args:
+            lecture_id: ID of the lecture
+            summary_text: Summary text
+            user_context: User context for audit logging
+            
+        Returns:
+            S3 URI of the saved summary, or None if there was no summary
+        """
+        # Don't save if summary is None
+        if summary_text is None:
+            logger.info("No summary to save", lecture_id=lecture_id)
+            return None
+        
+        s3_key = f"summaries/{lecture_id}.txt"
+        
+        try:
+            # Get KMS key ID
+            kms_key_id = self._get_kms_key_id(self.kms_summary_alias)
+            
+            # Encode once for both the hash and the upload
+            body = summary_text.encode('utf-8')
+            
+            self.s3_client.put_object(
+                Bucket=self.summary_bucket,
+                Key=s3_key,
+                Body=body,
+                ServerSideEncryption='aws:kms',
+                SSEKMSKeyId=kms_key_id,
+                ContentType='text/plain; charset=utf-8',
+                Metadata={
+                    'lecture_id': lecture_id,
+                    'content_hash': hashlib.sha256(body).hexdigest()
+                }
+            )
+            
+            s3_uri = f"s3://{self.summary_bucket}/{s3_key}"
+            
+            logger.info("Summary saved successfully",
+                       lecture_id=lecture_id,
+                       s3_uri=s3_uri)
+            
+            # Audit trail
+            if user_context:
+                logger.audit_trail(
+                    action="SAVE_SUMMARY",
+                    resource=s3_key,
+                    user_id=user_context.get('user_id'),
+                    result="success"
+                )
+            
+            return s3_uri
+            
+        except ClientError as e:
+            logger.error("Failed to save summary",
+                        error=str(e),
+                        lecture_id=lecture_id)
+            raise
+    
+    def save_transcript_with_timestamps(self, lecture_id: str, transcription_result: Any) -> str:
+        """
+        Save a transcript with timestamps to S3 with KMS encryption
+        
+        Args:
+            lecture_id: ID of the lecture
+            transcription_result: Full transcription result with segments
+            
+        Returns:
+            S3 URI of the saved transcript
+        """
+        from ..transcription.utils import format_timestamp
+        
+        s3_key = f"transcripts/{lecture_id}_with_timestamps.txt"
+        
+        segments = transcription_result.get("segments", [])
+        
+        # Join the lines once and encode the result once
+        body = "".join([
+            f"[{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}] {segment['text']}\n"
+            for segment in segments
+        ]).encode('utf-8')
+        
+        try:
+            # Get KMS key ID
+            kms_key_id = self._get_kms_key_id(self.kms_transcript_alias)
+            
+            self.s3_client.put_object(
+                Bucket=self.transcript_bucket,
+                Key=s3_key,
+                Body=body,
+                ServerSideEncryption='aws:kms',
+                SSEKMSKeyId=kms_key_id,
+                ContentType='text/plain; charset=utf-8',
+                Metadata={
+                    'lecture_id': lecture_id,
+                    'content_hash': hashlib.sha256(body).hexdigest()
+                }
+            )
+            
+            s3_uri = f"s3://{self.transcript_bucket}/{s3_key}"
+            
+            logger.info("Timestamped transcript saved successfully",
+                       lecture_id=lecture_id,
+                       s3_uri=s3_uri)
+            
+            return s3_uri
+            
+        except ClientError as e:
+            logger.error("Failed to save timestamped transcript",
+                        error=str(e),
+                        lecture_id=lecture_id)
+            raise
+    
     def save_metadata(self, lecture_id: str, metadata: Dict[str, Any],
                      user_context: Optional[Dict[str, Any]] = None) -> bool:
         """
@@ -269,22 +418,7 @@ class SecureAWSStorage:
         Returns:
             True if successful
         """
-        # Add timestamps if not present
-        current_time = datetime.utcnow()
-        if 'created_at' not in metadata:
-            metadata['created_at'] = current_time.isoformat()
-        if 'updated_at' not in metadata:
-            metadata['updated_at'] = current_time.isoformat()
-        
-        # Add TTL for automatic cleanup (18 months)
-        ttl_date = current_time + timedelta(days=548)
-        metadata['ttl'] = int(ttl_date.timestamp())
-        
-        # Add lecture_id and user context
-        metadata['lecture_id'] = lecture_id
-        if user_context:
-            metadata['user_id'] = user_context.get('user_id')
-            metadata['school_id'] = user_context.get('school_id')
+        self._prepare_metadata(lecture_id, metadata, user_context, datetime.utcnow())
         
         try:
             # Use conditional put to prevent overwrites
@@ -311,6 +445,102 @@ class SecureAWSStorage:
                            lecture_id=lecture_id)
                 raise
     
+    def save_metadata_batch(self, items: Iterable[Tuple[str, Dict[str, Any]]],
+                            user_context: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Save metadata for many lectures, 25 items per BatchWriteItem request
+        
+        Unlike save_metadata, existing items are replaced rather than updated.
+        
+        Args:
+            items: (lecture_id, metadata) pairs
+            user_context: User context applied to every item
+            
+        Returns:
+            Number of items saved
+        """
+        current_time = datetime.utcnow()
+        count = 0
+        
+        try:
+            # batch_writer groups the puts and resends unprocessed items;
+            # a lecture listed twice keeps only its last metadata
+            with self.metadata_table.batch_writer(overwrite_by_pkeys=['lecture_id']) as batch:
+                for lecture_id, metadata in items:
+                    self._prepare_metadata(lecture_id, metadata, user_context, current_time)
+                    batch.put_item(Item=metadata)
+                    count += 1
+        except ClientError as e:
+            logger.error("Failed to save metadata batch",
+                        error=str(e),
+                        item_count=count)
+            raise
+        
+        logger.info("Metadata batch saved successfully",
+                   item_count=count,
+                   has_user_context=bool(user_context))
+        
+        return count
+    
+    def _prepare_metadata(self, lecture_id: str, metadata: Dict[str, Any],
+                          user_context: Optional[Dict[str, Any]], current_time: datetime) -> None:
+        """Add the keys, timestamps, TTL and user context every metadata item carries"""
+        # Add timestamps if not present
+        if 'created_at' not in metadata:
+            metadata['created_at'] = current_time.isoformat()
+        if 'updated_at' not in metadata:
+            metadata['updated_at'] = current_time.isoformat()
+        
+        # Add TTL for automatic cleanup (18 months)
+        ttl_date = current_time + timedelta(days=548)
+        metadata['ttl'] = int(ttl_date.timestamp())
+        
+        # Add lecture_id, the DateIndex partition and user context
+        metadata['lecture_id'] = lecture_id
+        metadata['gsi_pk'] = LECTURE_PARTITION
+        if user_context:
+            metadata['user_id'] = user_context.get('user_id')
+            metadata['school_id'] = user_context.get('school_id')
+    
+    def list_lectures(self, limit: int = 100, filter_expr: Optional[Any] = None) -> List[str]:
+        """
+        List lectures, newest first
+        
+        Args:
+            limit: Maximum number of lectures to return
+            filter_expr: Optional boto3 condition (e.g. Attr('school_id').eq(...))
+                applied to each page
+            
+        Returns:
+            List of lecture IDs
+        """
+        # Read the DateIndex in descending created_at order, a page at a time;
+        # a filter can leave a page short, so keep going until there are enough.
+        # Items saved before the index existed lack gsi_pk and are only listed
+        # once scripts/setup_aws.py --backfill-date-index has tagged them
+        query_args = {
+            'IndexName': 'DateIndex',
+            'KeyConditionExpression': Key('gsi_pk').eq(LECTURE_PARTITION),
+            'ScanIndexForward': False,
+            'Limit': min(limit, 100)
+        }
+        if filter_expr is not None:
+            query_args['FilterExpression'] = filter_expr
+        
+        lecture_ids = []
+        try:
+            while len(lecture_ids) < limit:
+                response = self.metadata_table.query(**query_args)
+                lecture_ids.extend(item['lecture_id'] for item in response.get('Items', []))
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_args['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        except ClientError as e:
+            logger.error("Failed to list lectures", error=str(e))
+            raise
+        
+        return lecture_ids[:limit]
+    
     def _update_metadata(self, lecture_id: str, metadata: Dict[str, Any]) -> bool:
         """Update existing metadata"""
         try:
@@ -56,6 +56,21 @@ def get_audio_duration(file_path):
         logger.error(f"Error getting audio duration: {e}")
         return None
 
+def load_audio(file_path, sampling_rate=16000):
+    """
+    Decode an audio or video file to mono float32 samples for Whisper
+    Decodes in-process with PyAV, reading only the audio stream
+    
+    Args:
+        file_path: Path to the audio or video file
+        sampling_rate: Target sample rate in Hz
+        
+    Returns:
+        1-D numpy float32 array of samples
+    """
+    from faster_whisper import decode_audio
+    return decode_audio(str(file_path), sampling_rate=sampling_rate)
+
 def create_temp_dir(prefix="whisper_mowd_"):
     """
     Create a temporary directory for processing files
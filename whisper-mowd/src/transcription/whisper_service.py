@@ -8,13 +8,10 @@ import logging
 from pathlib import Path
 import threading
 
-# Import faster-whisper at the top
-try:
-    from faster_whisper import WhisperModel
-    FASTER_WHISPER_AVAILABLE = True
-except ImportError:
-    FASTER_WHISPER_AVAILABLE = False
-    
+import numpy as np
+
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,12 +19,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger("whisper-service")
 
+SAMPLE_RATE = 16000  # Whisper's input sample rate
+
+# Speech chunks found by VAD are decoded this many at a time; silence between
+# them never reaches the encoder
+DEFAULT_BATCH_SIZE = 8
+
+# Fastest first: int8 weights with the widest float type the device's kernels
+# support (VNNI int8 GEMM on CPU, int8 + tensor cores on GPU)
+COMPUTE_TYPE_PREFERENCE = ("int8_float16", "int8_float32", "int8", "float16", "float32")
+
+def resolve_compute_type(device, compute_type="auto"):
+    """
+    Resolve "auto" to the fastest compute type CTranslate2 supports on a device
+    
+    Args:
+        device: "cpu" or "cuda"
+        compute_type: Requested compute type, or "auto"
+        
+    Returns:
+        Compute type name (explicit values pass through)
+    """
+    if compute_type != "auto":
+        return compute_type
+    try:
+        import ctranslate2
+        supported = ctranslate2.get_supported_compute_types(device)
+    except Exception:
+        return "auto"
+    for candidate in COMPUTE_TYPE_PREFERENCE:
+        if candidate in supported:
+            return candidate
+    return "auto"
+
+def resolve_device(device="auto"):
+    """
+    Resolve "auto" to the device CTranslate2 will actually run on
+    
+    Args:
+        device: "cpu", "cuda", or "auto"
+        
+    Returns:
+        "cuda" if a GPU is visible, otherwise "cpu" (explicit values pass through)
+    """
+    if device != "auto":
+        return device
+    try:
+        import ctranslate2
+        return "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    except Exception:
+        return "cpu"
+
 class WhisperTranscriber:
     """
     Handles transcription of audio files using Faster-Whisper (CTranslate2)
     """
     
-    def __init__(self, model_size="base", device="auto", compute_type="auto"):
+    def __init__(self, model_size="base", device="auto", compute_type="auto", num_workers=1,
+                 vad_parameters=None, batch_size=DEFAULT_BATCH_SIZE, cpu_threads=0):
         """
         Initialize the transcriber with the specified Whisper model
         
@@ -35,61 +84,92 @@ class WhisperTranscriber:
             model_size: Size of Whisper model to use (tiny, base, small, medium, large)
             device: Device to use for inference ("cpu", "cuda", or "auto")
             compute_type: Compute type to use ("float32", "float16", "int8", or "auto")
+            num_workers: Number of transcriptions the model can run in parallel
+                when transcribe() is called from several threads
+            vad_parameters: Silero VAD options used to skip silence before decoding
+                (default: min_silence_duration_ms=500)
+            batch_size: Speech chunks decoded together per forward pass; values
+                above 1 use faster-whisper's batched pipeline (1 decodes the
+                audio sequentially)
+            cpu_threads: Threads CTranslate2 uses on CPU (0 keeps its default)
         """
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
+        self.num_workers = num_workers
+        self.vad_parameters = vad_parameters or dict(min_silence_duration_ms=500)
+        self.batch_size = batch_size
+        self.cpu_threads = cpu_threads
         self.model = None  # Lazy-load the model when needed
+        self._model_lock = threading.Lock()
         self._transcription_complete = False
         self.cancel_requested = False
         
     def _load_model(self):
         """Lazy-load the Whisper model when needed"""
         if self.model is None:
-            if not FASTER_WHISPER_AVAILABLE:
-                logger.warning("faster-whisper not available, falling back to original whisper")
-                import whisper
-                self.model = whisper.load_model(self.model_size)
-                return self.model
-                
-            logger.info(f"Loading Faster-Whisper {self.model_size} model...")
-            logger.info(f"Device: {self.device}, Compute type: {self.compute_type}")
-            
-            start_time = time.time()
-            self.model = WhisperModel(
-                self.model_size, 
-                device=self.device, 
-                compute_type=self.compute_type
-            )
-            load_time = time.time() - start_time
-            
-            logger.info(f"Model loaded in {load_time:.2f} seconds")
+            # Threads sharing this transcriber can race here on their first
+            # call; only one of them loads the model
+            with self._model_lock:
+                if self.model is None:
+                    self.model = self._build_model()
         
         return self.model
     
+    def _build_model(self):
+        """Load the Whisper model, wrapped in the batched pipeline when batching"""
+        device = resolve_device(self.device)
+        compute_type = resolve_compute_type(device, self.compute_type)
+        logger.info(f"Loading Faster-Whisper {self.model_size} model...")
+        logger.info(f"Device: {device}, Compute type: {compute_type}, Batch size: {self.batch_size}")
+        
+        start_time = time.time()
+        model = WhisperModel(
+            self.model_size, 
+            device=device, 
+            compute_type=compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers
+        )
+        if self.batch_size > 1:
+            model = BatchedInferencePipeline(model=model)
+        load_time = time.time() - start_time
+        
+        logger.info(f"Model loaded in {load_time:.2f} seconds")
+        return model
+    
     def transcribe(self, audio_path):
         """
         Transcribe an audio file using Whisper
         
         Args:
-            audio_path: Path to the audio file
+            audio_path: Path to the audio file, or 16 kHz mono float32 samples
+                already decoded with load_audio()
             
         Returns:
             Dict containing the transcription result
         """
         self.cancel_requested = False
         
-        audio_path = Path(audio_path)
-        
-        if not audio_path.exists():
-            raise FileNotFoundError(f"Audio file not found: {audio_path}")
-        
-        logger.info(f"Transcribing {audio_path}")
+        if isinstance(audio_path, np.ndarray):
+            audio = audio_path
+            duration = len(audio) / SAMPLE_RATE
+            logger.info(f"Transcribing {duration:.1f}s of pre-decoded audio")
+        else:
+            audio_path = Path(audio_path)
+            
+            if not audio_path.exists():
+                raise FileNotFoundError(f"Audio file not found: {audio_path}")
+            
+            audio = str(audio_path)
+            duration = None
+            logger.info(f"Transcribing {audio_path}")
         
         # First, try to get audio duration for time estimate
         try:
-            from src.transcription.utils import get_audio_duration
-            duration = get_audio_duration(audio_path)
+            if duration is None:
+                from src.transcription.utils import get_audio_duration
+                duration = get_audio_duration(audio_path)
             if duration:
                 # Rough estimates based on model size and hardware
                 speed_factors = {
@@ -136,50 +216,40 @@ class WhisperTranscriber:
             # Perform transcription
             start_time = time.time()
             
-            # Define progress callback
-            def progress_callback(progress):
-                logger.info(f"Transcription progress: {progress*100:.1f}%")
+            options = dict(
+                beam_size=5,
+                vad_filter=True,
+                vad_parameters=self.vad_parameters
+            )
+            if self.batch_size > 1:
+                options["batch_size"] = self.batch_size
+            segments, info = model.transcribe(audio, **options)
+                            
+            # Convert segments to the original whisper format in the same
+            # pass that drains the generator, with a cancellation check
+            segments_list = []
+            for i, segment in enumerate(segments):
+                if self.cancel_requested:
+                    logger.info("Transcription cancelled by user")
+                    raise InterruptedError("Transcription cancelled by user")
+                segments_list.append({
+                    "id": i,
+                    "start": segment.start,
+                    "end": segment.end,
+                    "text": segment.text,
+                    "words": getattr(segment, "words", [])
+                })
             
-            if FASTER_WHISPER_AVAILABLE:
-                # Using faster-whisper without progress callback
-                segments, info = model.transcribe(
-                    str(audio_path),
-                    beam_size=5,
-                    vad_filter=True,
-                    vad_parameters=dict(min_silence_duration_ms=500)
-                )
-                                
-                # Create segments list with cancellation check
-                segments_list = []
-                for segment in segments:
-                    if self.cancel_requested:
-                        logger.info("Transcription cancelled by user")
-                        raise InterruptedError("Transcription cancelled by user")
-                    segments_list.append(segment)
-                
-                # Reformat to match original whisper format
-                result = {
-                    "text": " ".join([segment.text for segment in segments_list]),
-                    "segments": [
-                        {
-                            "id": i,
-                            "start": segment.start,
-                            "end": segment.end,
-                            "text": segment.text,
-                            "words": getattr(segment, "words", [])
-                        } for i, segment in enumerate(segments_list)
-                    ],
-                    "language": info.language
-                }
-            else:
-                # Using original whisper
-                result = model.transcribe(str(audio_path))
+            result = {
+                "text": " ".join([segment["text"] for segment in segments_list]),
+                "segments": segments_list,
+                "language": info.language
+            }
             
             transcribe_time = time.time() - start_time
             
             logger.info(f"Transcription completed in {transcribe_time:.2f} seconds")
-            if FASTER_WHISPER_AVAILABLE:
-                logger.info(f"Detected language: {result['language']}")
+            logger.info(f"Detected language: {result['language']}")
                             
             if not result.get("text"):
                 logger.warning("Transcription completed but produced empty text output")
@@ -253,6 +323,12 @@ class WhisperTranscriber:
                 words.extend(segment["words"])
         return words
     
+    def unload(self):
+        """Release the loaded model; it is loaded again on the next transcribe()"""
+        if self.model is not None:
+            logger.info(f"Unloading Faster-Whisper {self.model_size} model")
+            self.model = None
+    
     def cancel_transcription(self):
         """Request cancellation of the current transcription"""
         self.cancel_requested = True
@@ -0,0 +1,128 @@
+"""
+Tests for the auth module
+Unit tests for jwt_validator.py
+"""
+
+import os
+import time
+import types
+import unittest
+from unittest.mock import patch, MagicMock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Add the parent directory to the Python path
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The validator reads its settings and prefetches the JWKS at import time
+with patch.dict('os.environ', {
+    'AWS_REGION': 'us-east-1',
+    'COGNITO_USER_POOL_ID': 'us-east-1_test',
+    'COGNITO_CLIENT_ID': 'test-client'
+}), patch('jwt.PyJWKClient'):
+    from src.auth import jwt_validator
+
+class TestJWTValidatorCache(unittest.TestCase):
+    """Test cases for the verified-claims cache in JWTValidator"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create a signing key pair for the test tokens"""
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def setUp(self):
+        """Set up a fresh validator with a stubbed JWKS client"""
+        self.jwks_client = MagicMock()
+        self.jwks_client.get_signing_key.return_value.key = self.private_key.public_key()
+
+        self.now = time.time()
+        self.clock = types.SimpleNamespace(time=lambda: self.now, monotonic=time.monotonic)
+
+        patchers = [
+            patch.object(jwt_validator, 'jwks_client', self.jwks_client),
+            patch.object(jwt_validator, 'time', self.clock),
+            patch.object(jwt_validator, '_claims_cache', jwt_validator.OrderedDict()),
+            patch.object(jwt_validator, '_signing_keys', {}),
+            patch.object(jwt_validator.jwt, 'decode', wraps=jwt.decode)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.decode = jwt_validator.jwt.decode
+
+        self.validator = jwt_validator.JWTValidator()
+
+    def make_token(self, username="user1", expires_in=3600):
+        """Sign a token carrying every claim the validator requires"""
+        issued_at = int(time.time())
+        claims = {
+            'iss': self.validator.issuer,
+            'aud': self.validator.client_id,
+            'exp': issued_at + expires_in,
+            'iat': issued_at,
+            'auth_time': issued_at,
+            'token_use': 'id',
+            'cognito:username': username,
+            'custom:school_id': 'school1',
+            'custom:role': 'teacher'
+        }
+        return jwt.encode(claims, self.private_key, algorithm='RS256', headers={'kid': 'key1'})
+
+    def test_cache_hit(self):
+        """Test a repeated token is served from the cache"""
+        token = self.make_token()
+
+        first = self.validator.validate_token(token)
+        second = self.validator.validate_token(token)
+
+        self.assertEqual(self.decode.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(second['cognito:username'], 'user1')
+
+    def test_cache_returns_copy(self):
+        """Test changing returned claims doesn't change the cached entry"""
+        token = self.make_token()
+
+        self.validator.validate_token(token)['custom:role'] = 'admin'
+        self.validator.validate_token(token)['custom:role'] = 'admin'
+
+        self.assertEqual(self.validator.validate_token(token)['custom:role'], 'teacher')
+
+    def test_cache_expiry(self):
+        """Test a cached token is verified again once close to its exp"""
+        token = self.make_token(expires_in=120)
+        self.validator.validate_token(token)
+
+        # Still inside the cache window
+        self.now += 120 - jwt_validator.CLAIMS_CACHE_MARGIN - 1
+        self.validator.validate_token(token)
+        self.assertEqual(self.decode.call_count, 1)
+
+        # Past exp minus the margin
+        self.now += 2
+        self.validator.validate_token(token)
+        self.assertEqual(self.decode.call_count, 2)
+
+    def test_cache_eviction(self):
+        """Test the least recently used token is evicted at CLAIMS_CACHE_SIZE"""
+        tokens = [self.make_token(username=f"user{i}") for i in range(3)]
+
+        with patch.object(jwt_validator, 'CLAIMS_CACHE_SIZE', 2):
+            self.validator.validate_token(tokens[0])
+            self.validator.validate_token(tokens[1])
+            # Touch the first token, so the second is least recently used
+            self.validator.validate_token(tokens[0])
+            self.validator.validate_token(tokens[2])
+            self.assertEqual(self.decode.call_count, 3)
+            self.assertEqual(len(jwt_validator._claims_cache), 2)
+
+            # The first is still cached, the second has to be verified again
+            self.validator.validate_token(tokens[0])
+            self.assertEqual(self.decode.call_count, 3)
+            self.validator.validate_token(tokens[1])
+            self.assertEqual(self.decode.call_count, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the GDPR module
+Unit tests for deletion_handler.py
+"""
+
+import os
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to the Python path
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The handler reads its settings and builds its AWS clients at import time
+with patch.dict('os.environ', {
+    'AUDIO_BUCKET': 'test-audio-bucket',
+    'TRANSCRIPT_BUCKET': 'test-transcript-bucket',
+    'SUMMARY_BUCKET': 'test-summary-bucket',
+    'METADATA_TABLE': 'test-metadata-table',
+    'AUDIT_TABLE': 'test-audit-table'
+}), patch('boto3.client'), patch('boto3.resource'):
+    from src.gdpr import deletion_handler
+
+class TestDeleteUserData(unittest.TestCase):
+    """Test cases for delete_user_data with stubbed S3 and DynamoDB"""
+
+    def setUp(self):
+        """Set up stubbed clients and one user's audio file versions"""
+        self.mock_s3 = MagicMock()
+        self.mock_s3.delete_objects.return_value = {}
+        self.mock_table = MagicMock()
+
+        # Two versions per key, so four keys make four 2-object batches
+        self.versions = [
+            {'Key': f'lectures/lecture{i}.mp3', 'VersionId': f'v{version}'}
+            for i in range(1, 5)
+            for version in (1, 2)
+        ]
+
+        def list_versions(bucket, key_pattern):
+            if bucket == 'test-audio-bucket':
+                return self.versions, []
+            return [], []
+
+        patchers = [
+            patch.object(deletion_handler, 's3', self.mock_s3),
+            patch.object(deletion_handler, '_meta_table', self.mock_table),
+            patch.object(deletion_handler, 'S3_DELETE_BATCH_SIZE', 2),
+            patch.object(deletion_handler, 'list_object_versions', side_effect=list_versions)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user_data = {
+            'audio_files': ['lectures/lecture.*'],
+            'transcripts': ['transcripts/lecture.txt'],
+            'summaries': ['summaries/lecture.txt'],
+            'metadata_items': ['lecture1', 'lecture2', 'lecture3', 'lecture4']
+        }
+
+    def test_delete_all(self):
+        """Test every object and metadata item is counted when nothing fails"""
+        results = deletion_handler.delete_user_data(self.user_data)
+
+        self.assertEqual(self.mock_s3.delete_objects.call_count, 4)
+        self.assertEqual(results['audio_deleted'], 4)
+        self.assertEqual(results['transcripts_deleted'], 0)
+        self.assertEqual(results['metadata_deleted'], 4)
+        self.assertEqual(results['errors'], [])
+
+    def test_delete_partial_errors(self):
+        """Test only the keys S3 reports as failed are left out of the count"""
+        def delete_objects(Bucket, Delete):
+            if Delete['Objects'][0]['Key'] == 'lectures/lecture2.mp3':
+                return {'Errors': [{'Key': 'lectures/lecture2.mp3', 'Code': 'AccessDenied'}]}
+            return {}
+        self.mock_s3.delete_objects.side_effect = delete_objects
+
+        results = deletion_handler.delete_user_data(self.user_data)
+
+        self.assertEqual(results['audio_deleted'], 3)
+        self.assertEqual(len(results['errors']), 1)
+        self.assertIn('lectures/lecture2.mp3', results['errors'][0])
+        self.assertEqual(results['summary']['total_errors'], 1)
+
+    def test_delete_batch_exception(self):
+        """Test a failed DeleteObjects call only marks its own batch's keys"""
+        def delete_objects(Bucket, Delete):
+            if Delete['Objects'][0]['Key'] == 'lectures/lecture3.mp3':
+                raise Exception("Service unavailable")
+            return {}
+        self.mock_s3.delete_objects.side_effect = delete_objects
+
+        results = deletion_handler.delete_user_data(self.user_data)
+
+        self.assertEqual(results['audio_deleted'], 3)
+        self.assertEqual(len(results['errors']), 1)
+        self.assertIn('test-audio-bucket', results['errors'][0])
+
+    def test_delete_metadata_exception(self):
+        """Test a failed metadata batch is reported without stopping S3 deletes"""
+        self.mock_table.batch_writer.side_effect = Exception("Throttled")
+
+        results = deletion_handler.delete_user_data(self.user_data)
+
+        self.assertEqual(results['audio_deleted'], 4)
+        self.assertEqual(results['metadata_deleted'], 0)
+        self.assertEqual(len(results['errors']), 1)
+        self.assertEqual(results['summary']['total_metadata'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
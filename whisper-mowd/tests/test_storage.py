@@ -16,7 +16,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 # Import modules to test
 from src.storage.local_storage import LocalStorage
-from src.storage.secure_aws_storage import SecureAWSStorage as AWSStorage
+from src.storage.secure_aws_storage import SecureAWSStorage as AWSStorage, LECTURE_PARTITION
+from boto3.dynamodb.conditions import Attr
 
 class TestLocalStorage(unittest.TestCase):
     """Test cases for LocalStorage class"""
@@ -158,6 +159,7 @@ class TestAWSStorage(unittest.TestCase):
         self.env_patcher = patch.dict('os.environ', {
             'S3_LECTURE_BUCKET': 'test-lecture-bucket',
             'S3_TRANSCRIPT_BUCKET': 'test-transcript-bucket',
+            'S3_SUMMARY_BUCKET': 'test-summary-bucket',
             'DYNAMODB_TABLE': 'test-metadata-table',
             'AWS_REGION': 'us-east-1'
         })
@@ -358,30 +360,90 @@ class TestAWSStorage(unittest.TestCase):
         # Check result
         self.assertEqual(metadata, self.metadata)
     
+    def test_save_metadata_date_index_key(self):
+        """Test save_metadata stamps the DateIndex partition key"""
+        self.storage.save_metadata(self.lecture_id, self.metadata.copy())
+        
+        item = self.mock_table.put_item.call_args[1]['Item']
+        self.assertEqual(item['gsi_pk'], LECTURE_PARTITION)
+        self.assertIn('created_at', item)
+    
     def test_list_lectures(self):
-        """Test list_lectures method"""
+        """Test list_lectures reads the DateIndex newest first"""
         # Mock DynamoDB response
-        self.mock_table.scan.return_value = {
+        self.mock_table.query.return_value = {
             'Items': [
-                {'lecture_id': 'lecture1', 'title': 'Lecture 1'},
+                {'lecture_id': 'lecture3', 'title': 'Lecture 3'},
                 {'lecture_id': 'lecture2', 'title': 'Lecture 2'},
-                {'lecture_id': 'lecture3', 'title': 'Lecture 3'}
+                {'lecture_id': 'lecture1', 'title': 'Lecture 1'}
             ]
         }
         
         # List lectures
         lectures = self.storage.list_lectures()
         
-        # Check that DynamoDB scan was called
-        self.mock_table.scan.assert_called_once()
+        # Check that the index was queried, not the table scanned
+        self.mock_table.query.assert_called_once()
+        self.mock_table.scan.assert_not_called()
         
         # Check arguments
-        kwargs = self.mock_table.scan.call_args[1]
+        kwargs = self.mock_table.query.call_args[1]
+        self.assertEqual(kwargs['IndexName'], 'DateIndex')
+        self.assertFalse(kwargs['ScanIndexForward'])
         self.assertEqual(kwargs['Limit'], 100)
+        self.assertNotIn('FilterExpression', kwargs)
         
         # Check result
-        self.assertEqual(len(lectures), 3)
-        self.assertEqual(lectures[0]['lecture_id'], 'lecture1')
+        self.assertEqual(lectures, ['lecture3', 'lecture2', 'lecture1'])
+    
+    def test_list_lectures_pagination(self):
+        """Test list_lectures follows LastEvaluatedKey and stops at the limit"""
+        self.mock_table.query.side_effect = [
+            {
+                'Items': [{'lecture_id': 'lecture5'}, {'lecture_id': 'lecture4'}],
+                'LastEvaluatedKey': {'lecture_id': 'lecture4'}
+            },
+            {
+                'Items': [{'lecture_id': 'lecture3'}, {'lecture_id': 'lecture2'}],
+                'LastEvaluatedKey': {'lecture_id': 'lecture2'}
+            },
+            {
+                'Items': [{'lecture_id': 'lecture1'}]
+            }
+        ]
+        
+        lectures = self.storage.list_lectures(limit=3)
+        
+        # The second page has enough, so the third is never read
+        self.assertEqual(self.mock_table.query.call_count, 2)
+        first, second = [call[1] for call in self.mock_table.query.call_args_list]
+        self.assertNotIn('ExclusiveStartKey', first)
+        self.assertEqual(second['ExclusiveStartKey'], {'lecture_id': 'lecture4'})
+        self.assertEqual(second['Limit'], 3)
+        
+        self.assertEqual(lectures, ['lecture5', 'lecture4', 'lecture3'])
+    
+    def test_list_lectures_filter(self):
+        """Test list_lectures keeps reading when a filter thins a page"""
+        school_filter = Attr('school_id').eq('school1')
+        self.mock_table.query.side_effect = [
+            {
+                'Items': [{'lecture_id': 'lecture4'}],
+                'LastEvaluatedKey': {'lecture_id': 'lecture3'}
+            },
+            {
+                'Items': [{'lecture_id': 'lecture1'}]
+            }
+        ]
+        
+        lectures = self.storage.list_lectures(limit=3, filter_expr=school_filter)
+        
+        # Every page is filtered, and a short last page ends the listing
+        self.assertEqual(self.mock_table.query.call_count, 2)
+        for call in self.mock_table.query.call_args_list:
+            self.assertIs(call[1]['FilterExpression'], school_filter)
+        
+        self.assertEqual(lectures, ['lecture4', 'lecture1'])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -8,20 +8,21 @@ import unittest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import tempfile
+import threading
 
 # Add the parent directory to the Python path
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import modules to test
-from src.transcription.whisper_service import WhisperTranscriber
+from src.transcription.whisper_service import WhisperTranscriber, resolve_device, resolve_compute_type
 from src.transcription.file_converter import AudioFileConverter
 from src.transcription.utils import format_timestamp, format_segments_as_srt
 
 class TestWhisperTranscriber(unittest.TestCase):
     """Test cases for WhisperTranscriber class"""
     
-    @patch('whisper.load_model')
+    @patch('src.transcription.whisper_service.WhisperModel')
     def test_init(self, mock_load_model):
         """Test initialization"""
         transcriber = WhisperTranscriber(model_size="tiny")
@@ -29,20 +30,39 @@ class TestWhisperTranscriber(unittest.TestCase):
         # Model should not be loaded yet (lazy loading)
         mock_load_model.assert_not_called()
     
-    @patch('whisper.load_model')
+    @patch('src.transcription.whisper_service.WhisperModel')
     def test_lazy_loading(self, mock_load_model):
         """Test lazy loading of model"""
         mock_model = MagicMock()
         mock_load_model.return_value = mock_model
         
-        transcriber = WhisperTranscriber(model_size="tiny")
+        transcriber = WhisperTranscriber(model_size="tiny", device="cpu", compute_type="int8", batch_size=1)
         # Access the model to trigger loading
         model = transcriber._load_model()
         
-        mock_load_model.assert_called_once_with("tiny")
+        mock_load_model.assert_called_once_with("tiny", device="cpu", compute_type="int8", cpu_threads=0, num_workers=1)
         self.assertEqual(model, mock_model)
-    
-    @patch('whisper.load_model')
+
+    @patch('src.transcription.whisper_service.WhisperModel')
+    def test_concurrent_loading(self, mock_load_model):
+        """Test threads racing on the first call load the model once"""
+        release = threading.Event()
+        mock_load_model.side_effect = lambda *args, **kwargs: release.wait(1) and MagicMock()
+
+        transcriber = WhisperTranscriber(model_size="tiny", device="cpu", compute_type="int8", batch_size=1)
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(transcriber._load_model()))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        mock_load_model.assert_called_once()
+        self.assertEqual(len(set(map(id, models))), 1)
+
+    @patch('src.transcription.whisper_service.WhisperModel')
     def test_get_text(self, mock_load_model):
         """Test get_text method"""
         transcriber = WhisperTranscriber()
@@ -50,7 +70,7 @@ class TestWhisperTranscriber(unittest.TestCase):
         
         self.assertEqual(transcriber.get_text(result), "Hello world")
     
-    @patch('whisper.load_model')
+    @patch('src.transcription.whisper_service.WhisperModel')
     def test_get_segments(self, mock_load_model):
         """Test get_segments method"""
         transcriber = WhisperTranscriber()
@@ -59,6 +79,40 @@ class TestWhisperTranscriber(unittest.TestCase):
         result = {"segments": segments}
         
         self.assertEqual(transcriber.get_segments(result), segments)
+    
+    @patch('ctranslate2.get_cuda_device_count')
+    def test_resolve_device(self, mock_cuda_count):
+        """Test resolve_device picks CUDA only when a GPU is visible"""
+        mock_cuda_count.return_value = 0
+        self.assertEqual(resolve_device("auto"), "cpu")
+        
+        mock_cuda_count.return_value = 1
+        self.assertEqual(resolve_device("auto"), "cuda")
+        
+        # Explicit devices are passed through untouched
+        self.assertEqual(resolve_device("cpu"), "cpu")
+    
+    @patch('ctranslate2.get_supported_compute_types')
+    def test_resolve_compute_type(self, mock_supported):
+        """Test resolve_compute_type prefers int8 kernels the device supports"""
+        mock_supported.return_value = {"int8", "int8_float32", "float32"}
+        self.assertEqual(resolve_compute_type("cpu"), "int8_float32")
+        
+        mock_supported.return_value = {"int8", "int8_float16", "float16", "float32"}
+        self.assertEqual(resolve_compute_type("cuda"), "int8_float16")
+        
+        # Explicit compute types are passed through untouched
+        self.assertEqual(resolve_compute_type("cpu", "float32"), "float32")
+
+    @patch('src.transcription.whisper_service.BatchedInferencePipeline')
+    @patch('src.transcription.whisper_service.WhisperModel')
+    def test_batched_pipeline(self, mock_model, mock_pipeline):
+        """Test batch_size above 1 wraps the model in the batched pipeline"""
+        transcriber = WhisperTranscriber(model_size="tiny", device="cpu", compute_type="int8", batch_size=8)
+        model = transcriber._load_model()
+
+        mock_pipeline.assert_called_once_with(model=mock_model.return_value)
+        self.assertEqual(model, mock_pipeline.return_value)
 
 class TestAudioFileConverter(unittest.TestCase):
     """Test cases for AudioFileConverter class"""